@@ -0,0 +1,81 @@
+import math
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from shared_cache import SHARED
+
+# --- NEXUS AI CEVAP CACHE'İ ---
+# Aynı coin, benzer fiyat (%0.5'lik kova), aynı gösterge özeti, dil ve soru için
+# Gemini'ye tekrar gidilmez. TTL + LRU ile sınırlı. Cache'te yoksa cevap parça parça
+# akıtılır (stream) ve tamamlandığında saklanır. Ortak katman açıksa cevaplar diğer
+# replikalarla da paylaşılır.
+
+PRICE_BUCKET = 0.005
+
+
+def price_bucket(price):
+    if not price or price <= 0: return 0
+    return round(math.log(price) / math.log1p(PRICE_BUCKET))
+
+
+def normalize_question(q):
+    q = re.sub(r"[^\w\s]", " ", (q or "").lower())
+    return " ".join(q.split())
+
+
+def tech_snapshot(tech):
+    if not tech: return None
+    return (round(tech['rsi'], 0), tech['rsi_msg'], tech['macd_msg'], tech['trend'])
+
+
+def make_key(kind, coin_id, price, language, tech=None, question=""):
+    return (kind, coin_id, price_bucket(price), tech_snapshot(tech), language, normalize_question(question))
+
+
+class ResponseCache:
+    def __init__(self, ttl=900, max_items=512, shared=SHARED):
+        self.ttl = ttl
+        self.max_items = max_items
+        self.shared = shared
+        self._lock = threading.Lock()
+        self._items = OrderedDict()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None and time.monotonic() - hit[0] > self.ttl:
+                del self._items[key]
+                hit = None
+            if hit is not None:
+                self._items.move_to_end(key)
+                return hit[1]
+        shared = self.shared.get(("ai",) + key)
+        if shared is None or time.time() - shared[0] > self.ttl: return None
+        self._store(key, shared[1], time.monotonic() - (time.time() - shared[0]))
+        return shared[1]
+
+    def put(self, key, text):
+        self._store(key, text, time.monotonic())
+        self.shared.put(("ai",) + key, text, self.ttl)
+
+    def _store(self, key, text, t):
+        with self._lock:
+            self._items[key] = (t, text)
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_items: self._items.popitem(last=False)
+
+
+AI_CACHE = ResponseCache()
+
+
+# st.write_stream ile kullanılır; cevap tamamen gelirse cache'e yazılır
+def stream_answer(model, prompt, key, cache=AI_CACHE):
+    parts = []
+    for chunk in model.generate_content(prompt, stream=True):
+        try: text = chunk.text
+        except ValueError: continue  # güvenlik filtresi vb. metinsiz parça
+        parts.append(text)
+        yield text
+    if parts: cache.put(key, "".join(parts))
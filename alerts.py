@@ -0,0 +1,247 @@
+import os
+import queue
+import threading
+import time
+from bisect import bisect_left, bisect_right
+
+from metrics import METRICS, log
+from ts_store import DATA_DIR, LocalDB
+
+# --- FİYAT / GÖSTERGE ALARMLARI ---
+# "ETH 3000$ altında", "BTC RSI(14) 70 üstünde" gibi alarmlar coin + metrik + yön başına
+# sıralı eşik listelerinde tutulur. Yeni bir değer geldiğinde sadece önceki değer ile yeni
+# değer arasında kalan (yani kesilen) eşikler bisect ile bulunur; diğer alarmlara bakılmaz.
+# Alarm bir kez tetiklenince COOLDOWN boyunca tekrar bildirilmez. Alarmlar ve tetiklenme
+# kayıtları SQLite'ta (WAL) saklanır; süreç açılırken indeks depodan kurulur, sync() ile
+# diğer replikaların eklediği/sildiği alarmlar alınır ve EVENT_KEEP'ten eski kayıtlar silinir.
+# Tetiklenmeler tick yolunda diske yazılmaz: bekleme süresi bellekte kontrol edilir, kayıtlar
+# kuyruğa atılır ve yazıcı thread'i tarafından toplu yazılır. Aynı kesişmeyi birden fazla
+# replika görse de tetiklenme depoda koşullu güncelleme ile tek kez yazılır.
+# Fiyat eşikleri baz para biriminde (USD) tutulur; RSI ölçekten bağımsızdır.
+
+DB_PATH = os.environ.get("NEXUS_ALERTS_DB", os.path.join(DATA_DIR, "alerts.db"))
+METRIC_NAMES = ("price", "rsi")
+OPS = ("above", "below")
+COOLDOWN = 900         # sn; aynı alarm bu süre içinde tekrar tetiklenmez
+MAX_PER_OWNER = 50
+EVENT_KEEP = 7 * 86400  # sn; bundan eski tetiklenme kayıtları sync() sırasında silinir
+WRITE_BATCH = 1000      # yazıcının tek işlemde yazdığı en fazla tetiklenme
+WRITE_DELAY = 0.05      # sn; yazıcı ilk kayıttan sonra bu kadar bekleyip kuyruğu toplu boşaltır (birikmiş iş yoksa)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS alerts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    owner TEXT NOT NULL,
+    coin TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    op TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    cooldown INTEGER NOT NULL,
+    created_at INTEGER NOT NULL,
+    last_fired REAL NOT NULL DEFAULT 0,
+    UNIQUE (owner, coin, metric, op, threshold)
+);
+CREATE TABLE IF NOT EXISTS alert_events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    alert_id INTEGER NOT NULL,
+    owner TEXT NOT NULL,
+    coin TEXT NOT NULL,
+    metric TEXT NOT NULL,
+    op TEXT NOT NULL,
+    threshold REAL NOT NULL,
+    value REAL NOT NULL,
+    fired_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS alert_events_owner ON alert_events (owner, id);
+CREATE INDEX IF NOT EXISTS alert_events_fired ON alert_events (fired_at);
+"""
+
+
+# Tek (coin, metrik) için: yön başına eşikler artan sırada, ids aynı sırada
+class ThresholdBook:
+    __slots__ = ("above", "above_ids", "below", "below_ids", "last", "pending")
+
+    def __init__(self):
+        self.above, self.above_ids = [], []
+        self.below, self.below_ids = [], []
+        self.last = None
+        self.pending = []   # ilk değer gelmeden eklenen alarmlar; ilk değerde koşulları kontrol edilir
+
+    def _side(self, op):
+        return (self.above, self.above_ids) if op == "above" else (self.below, self.below_ids)
+
+    def add(self, alert_id, op, threshold):
+        ths, ids = self._side(op)
+        i = bisect_right(ths, threshold)
+        ths.insert(i, threshold)
+        ids.insert(i, alert_id)
+
+    def remove(self, alert_id, op, threshold):
+        ths, ids = self._side(op)
+        i = bisect_left(ths, threshold)
+        while i < len(ths) and ths[i] == threshold:
+            if ids[i] == alert_id:
+                del ths[i], ids[i]
+                return
+            i += 1
+
+    def __len__(self):
+        return len(self.above) + len(self.below)
+
+    # prev -> value geçişinde kesilen eşikler: yukarı (prev, value], aşağı [value, prev)
+    def crossed(self, value):
+        prev, self.last = self.last, value
+        if prev is None:
+            return [i for i, op, th in self.pending if (value >= th if op == "above" else value <= th)]
+        if value > prev: return self.above_ids[bisect_right(self.above, prev):bisect_right(self.above, value)]
+        if value < prev: return self.below_ids[bisect_left(self.below, value):bisect_left(self.below, prev)]
+        return []
+
+
+class AlertEngine:
+    def __init__(self, path=DB_PATH, cooldown=COOLDOWN):
+        self.path, self.cooldown = path, cooldown
+        self._conn = LocalDB(path)
+        self._lock = threading.Lock()
+        self._books = {}    # (coin, metric) -> ThresholdBook
+        self._alerts = {}   # id -> [owner, coin, metric, op, threshold, cooldown, last_fired]
+        self._conn().executescript(SCHEMA)
+        self.sync()
+        self._writes = queue.Queue()
+        threading.Thread(target=self._writer, name="nexus-alerts", daemon=True).start()
+
+    def _index(self, alert_id, rec):
+        _, coin, metric, op, threshold = rec[:5]
+        book = self._books.get((coin, metric))
+        if book is None: book = self._books[(coin, metric)] = ThresholdBook()
+        book.add(alert_id, op, threshold)
+        self._alerts[alert_id] = rec
+        return book
+
+    def _unindex(self, alert_id):
+        rec = self._alerts.pop(alert_id)
+        book = self._books[(rec[1], rec[2])]
+        book.remove(alert_id, rec[3], rec[4])
+        book.pending = [p for p in book.pending if p[0] != alert_id]
+        if not len(book): del self._books[(rec[1], rec[2])]
+
+    # Depodaki alarm setiyle bellekteki indeksi eşitler (başka replikaların değişiklikleri)
+    def sync(self):
+        self.prune()
+        rows = self._conn().execute("SELECT id, owner, coin, metric, op, threshold, cooldown, last_fired FROM alerts").fetchall()
+        with self._lock:
+            stored = {r[0]: list(r[1:]) for r in rows}
+            for i in [i for i in self._alerts if i not in stored]: self._unindex(i)
+            for i, rec in stored.items():
+                if i in self._alerts: self._alerts[i][6] = max(self._alerts[i][6], rec[6])
+                else: self._index(i, rec)
+        return len(stored)
+
+    def prune(self, keep=EVENT_KEEP):
+        with self._conn() as db: return db.execute("DELETE FROM alert_events WHERE fired_at < ?", (time.time() - keep,)).rowcount
+
+    # Aynı sahip + coin + metrik + yön + eşik tekrar eklenirse mevcut id döner
+    def add(self, owner, coin, metric, op, threshold, cooldown=None):
+        if metric not in METRIC_NAMES or op not in OPS: raise ValueError(f"geçersiz alarm: {metric} {op}")
+        threshold, cooldown = float(threshold), int(self.cooldown if cooldown is None else cooldown)
+        key = (owner, coin, metric, op, threshold)
+        find = "SELECT id FROM alerts WHERE owner = ? AND coin = ? AND metric = ? AND op = ? AND threshold = ?"
+        with self._conn() as db:
+            row = db.execute(find, key).fetchone()
+            if row is None:
+                if db.execute("SELECT COUNT(*) FROM alerts WHERE owner = ?", (owner,)).fetchone()[0] >= MAX_PER_OWNER: return None
+                db.execute("INSERT OR IGNORE INTO alerts (owner, coin, metric, op, threshold, cooldown, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                           key + (cooldown, int(time.time())))
+                row = db.execute(find, key).fetchone()
+            alert_id = row[0]
+        with self._lock:
+            if alert_id in self._alerts: return alert_id
+            book = self._index(alert_id, [owner, coin, metric, op, threshold, cooldown, 0.0])
+            last = book.last
+            if last is None: book.pending.append((alert_id, op, threshold))
+        # Koşul eklendiği anda zaten sağlanıyorsa hemen bildirilir
+        if last is not None and (last >= threshold if op == "above" else last <= threshold): self._fire([alert_id], metric, last)
+        return alert_id
+
+    def remove(self, owner, alert_id):
+        with self._lock:
+            rec = self._alerts.get(alert_id)
+            if rec is None or rec[0] != owner: return False
+            self._unindex(alert_id)
+        with self._conn() as db: db.execute("DELETE FROM alerts WHERE id = ?", (alert_id,))
+        return True
+
+    def alerts(self, owner):
+        with self._lock:
+            return [{"id": i, "coin": r[1], "metric": r[2], "op": r[3], "threshold": r[4], "last_fired": r[6]}
+                    for i, r in sorted(self._alerts.items()) if r[0] == owner]
+
+    # Değeri izlenmesi gereken coin'ler (poller ve canlı akış aboneliği için)
+    def coins(self, metric="price"):
+        with self._lock: return sorted(c for c, m in self._books if m == metric)
+
+    # --- DEĞERLENDİRME ---
+    def observe(self, coin, metric, value, now=None):
+        book = self._books.get((coin, metric))
+        if book is None or value is None or value != value: return []
+        with self._lock:
+            hits = book.crossed(float(value))
+            if book.pending and book.last is not None: book.pending = []
+        return self._fire(hits, metric, value, now) if hits else []
+
+    def observe_many(self, values, metric="price", now=None):
+        fired = []
+        for coin, value in values.items():
+            if (coin, metric) in self._books: fired += self.observe(coin, metric, value, now)
+        return fired
+
+    # Dönen tetiklenmeler bu replikanın kararıdır; başka replikanın önce yazdıkları yazıcıda elenir
+    def _fire(self, ids, metric, value, now=None):
+        now = now or time.time()
+        events, suppressed = [], 0
+        with self._lock:
+            for i in ids:
+                rec = self._alerts.get(i)
+                if rec is None: continue
+                if now - rec[6] < rec[5]:
+                    suppressed += 1
+                    continue
+                rec[6] = now
+                events.append((i, *rec[:5], float(value), now))
+        if suppressed: METRICS.inc("nexus_alerts_suppressed_total", suppressed, metric=metric)
+        if not events: return []
+        self._writes.put(events)
+        return [dict(zip(("alert_id", "owner", "coin", "metric", "op", "threshold", "value", "fired_at"), e)) for e in events]
+
+    # --- YAZICI ---
+    # Kuyruktaki tetiklenmeler tek işlemde yazılır. Bekleme süresi depoda da kontrol edilir;
+    # kesişmeyi ilk yazan replika bildirir, diğerlerinin kaydı düşer.
+    def _writer(self):
+        full = False
+        while True:
+            batch, n = self._writes.get(), 1
+            if not full: time.sleep(WRITE_DELAY)
+            while len(batch) < WRITE_BATCH:
+                try: batch, n = batch + self._writes.get_nowait(), n + 1
+                except queue.Empty: break
+            full = len(batch) >= WRITE_BATCH
+            try:
+                with self._conn() as db:
+                    events = [e for e in batch if db.execute("UPDATE alerts SET last_fired = ? WHERE id = ? AND last_fired <= ? - cooldown",
+                                                             (e[-1], e[0], e[-1])).rowcount]
+                    db.executemany("INSERT INTO alert_events (alert_id, owner, coin, metric, op, threshold, value, fired_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)", events)
+                METRICS.inc("nexus_alerts_fired_total", len(events))
+            except Exception: log.exception("alert write failed")
+            finally:
+                for _ in range(n): self._writes.task_done()
+
+    # Kuyruktaki tüm tetiklenmeler yazılana kadar bekler
+    def flush(self):
+        self._writes.join()
+
+    # after_id'den sonraki tetiklenmeler (eskiden yeniye)
+    def events(self, owner, after_id=0, limit=20):
+        rows = self._conn().execute(
+            "SELECT id, coin, metric, op, threshold, value, fired_at FROM alert_events WHERE owner = ? AND id > ? ORDER BY id DESC LIMIT ?",
+            (owner, after_id, limit)).fetchall()
+        return [dict(zip(("id", "coin", "metric", "op", "threshold", "value", "fired_at"), r)) for r in reversed(rows)]
@@ -1,16 +1,32 @@
+import time
+BOOT_T0 = time.perf_counter()
 import streamlit as st
-import google.generativeai as genai
-import requests
 import pandas as pd
-import plotly.graph_objects as go
-import time
+import numpy as np
 import os
-import datetime
 import base64
-import numpy as np
+import html
+import uuid
+from data_engine import EXECUTOR, PRICE_BATCHER, api_get, fan_out, fetch_price
+from cache_tier import swr_cached
+from ai_cache import AI_CACHE, make_key, stream_answer
+from coin_index import CoinIndex
+from alerts import MAX_PER_OWNER, AlertEngine
+from community import FeedStore
+from downsample import auto_interval, downsample_line, lttb_indices, point_budget, resample_ohlc
+from metrics import METRICS, lazy_import, log, serve_metrics
+from news import NEWS
+from live import BASE as LIVE_BASE, TICKS, LiveFeed, make_source
+from fx import BASE, convert_frame, convert_indicators, convert_quote, parse_rates
+from poller import MarketPoller
+from indicators import indicators_from_series
+import screener
+from ts_store import DAY, FRESH, LINE_COLS, LINE_SPECS, OHLC_COLS, OHLC_DAYS, OHLC_SPECS, STORE, empty, now_ms, tail_gap, window
+METRICS.observe_once("nexus_import_seconds", time.perf_counter() - BOOT_T0, module="app")
 
 # --- 1. AYARLAR ---
 st.set_page_config(layout="wide", page_title="NEXUS AI", page_icon="🦁", initial_sidebar_state="collapsed")
+RERUN_T0 = time.perf_counter()
 
 # SESSION STATE
 if 'theme_color' not in st.session_state: st.session_state.theme_color = '#F7931A'
@@ -19,10 +35,12 @@ if 'language' not in st.session_state: st.session_state.language = 'TR'
 if 'app_mode' not in st.session_state: st.session_state.app_mode = 'TERMINAL'
 if 'selected_coin' not in st.session_state: st.session_state.selected_coin = 'ethereum' 
 
-if 'posts' not in st.session_state: 
-    st.session_state.posts = [
-        {"user": "Admin 🦁", "msg": "NEXUS v20.1: Ekran genişletildi, logo düzeltildi.", "time": "Now"},
-    ]
+if 'feed_cursor' not in st.session_state: st.session_state.feed_cursor = None
+if 'alert_seen' not in st.session_state: st.session_state.alert_seen = None
+
+MODES = ["TERMINAL", "PRO TERMINAL", "SCREENER", "PORTAL"]
+DAY_OPTIONS = {"24 Saat": "1", "7 Gün": "7", "1 Ay": "30", "6 Ay": "180"}
+CANDLE_INTERVALS = {"Otomatik": None, "15dk": "15min", "1s": "1h", "4s": "4h", "1g": "1D"}
 
 THEMES = {
     "Bitcoin Turuncusu 🟠": "#F7931A",
@@ -33,51 +51,28 @@ THEMES = {
 }
 
 # --- LOGO YÜKLEME ---
-def get_base64_of_bin_file(bin_file):
-    with open(bin_file, 'rb') as f:
-        data = f.read()
-    return base64.b64encode(data).decode()
+# Diskten okuma + base64 süreç başına bir kez yapılır, tüm oturumlar paylaşır
+@st.cache_resource
+def get_logo_data_uri(path="logo.jpeg"):
+    if not os.path.exists(path): return None
+    with open(path, 'rb') as f:
+        return "data:image/jpeg;base64," + base64.b64encode(f.read()).decode()
 
-logo_path = "logo.jpeg"
-logo_base64 = get_base64_of_bin_file(logo_path) if os.path.exists(logo_path) else None
+logo_uri = get_logo_data_uri()
 
 # --- TEKNİK ANALİZ MOTORU ---
-def calculate_indicators(df):
-    if df.empty or len(df) < 26: return None
-    
-    delta = df['price'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    df['sma20'] = df['price'].rolling(window=20).mean()
-    
-    # Bollinger
-    df['std'] = df['price'].rolling(window=20).std()
-    df['upper_bb'] = df['sma20'] + (df['std'] * 2)
-    df['lower_bb'] = df['sma20'] - (df['std'] * 2)
-    
-    # MACD
-    exp1 = df['price'].ewm(span=12, adjust=False).mean()
-    exp2 = df['price'].ewm(span=26, adjust=False).mean()
-    df['macd'] = exp1 - exp2
-    df['signal'] = df['macd'].ewm(span=9, adjust=False).mean()
-    
-    last = df.iloc[-1]
-    
-    trend = "YÜKSELİŞ" if last['price'] > last['sma20'] else "DÜŞÜŞ"
-    rsi_msg = "AŞIRI ALIM" if last['rsi'] > 70 else "AŞIRI SATIM" if last['rsi'] < 30 else "NÖTR"
-    macd_msg = "AL" if last['macd'] > last['signal'] else "SAT"
-    
-    return {
-        "rsi": last['rsi'], "rsi_msg": rsi_msg,
-        "trend": trend, "sma20": last['sma20'],
-        "macd": last['macd'], "macd_sig": last['signal'], "macd_msg": macd_msg,
-        "upper_bb": last['upper_bb'], "lower_bb": last['lower_bb']
-    }
+# Hesap indicators.py'deki artımlı motorda; key (coin, para birimi, süre) verilirse
+# o seriye ait durum korunur ve sadece yeni noktalar işlenir. DataFrame'e kolon yazılmaz.
+@METRICS.timed("indicators")
+def calculate_indicators(arr, key=None):
+    if len(arr) < 26: return None
+    return indicators_from_series(arr['time'], arr['price'], key)
 
 # --- 2. CSS (KOZMETİK DÜZELTMELER BURADA) ---
-st.markdown(f"""
+# Metin tema rengi başına bir kez üretilir
+@st.cache_resource
+def build_css(theme_color):
+    return f"""
 <style>
     [data-testid="stSidebar"] {{display: none;}}
     
@@ -106,6 +101,8 @@ st.markdown(f"""
     .row-right {{ display: flex; align-items: center; flex: 2; justify-content: flex-end; }}
     .price-col {{ width: 30%; text-align: right; font-family: monospace; font-weight: bold; color: white; }}
     .stat-col {{ width: 20%; text-align: right; font-size: 14px; }}
+    .coin-rank {{ width: 36px; color: gray; font-size: 12px; }}
+    .coin-name {{ margin-left: 8px; font-weight: bold; }}
     
     /* LOGO DÜZELTMESİ (S HARFİ İÇİN) */
     .logo-container {{
@@ -124,7 +121,7 @@ st.markdown(f"""
         flex-shrink: 0; 
     }}
     .logo-text {{
-        color: {st.session_state.theme_color};
+        color: {theme_color};
         margin: 0;
         font-size: 24px; /* Okunabilirlik için ideal boyut */
         font-weight: 900;
@@ -133,87 +130,371 @@ st.markdown(f"""
     }}
     
     div.stButton > button {{ width: 100%; border-radius: 8px; font-weight: 700; font-size: 13px; text-transform: uppercase; padding: 8px 0px; }}
-    div.stButton > button[kind="primary"] {{ background-color: {st.session_state.theme_color}; color: black; border: none; font-size: 14px; font-weight: 900; }}
+    div.stButton > button[kind="primary"] {{ background-color: {theme_color}; color: black; border: none; font-size: 14px; font-weight: 900; }}
 </style>
-""", unsafe_allow_html=True)
+"""
 
-# --- API ---
-try:
-    api_key = st.secrets.get("GEMINI_API_KEY", "")
-    if api_key: genai.configure(api_key=api_key)
-except: pass
+st.markdown(build_css(st.session_state.theme_color), unsafe_allow_html=True)
 
+# --- API ---
+# google.generativeai sadece ilk AI isteğinde yüklenir
 @st.cache_resource
 def get_model():
-    try: return genai.GenerativeModel("gemini-pro", generation_config={"temperature": 0.2})
-    except: pass
-    return None
-
-# --- VERİ MOTORU ---
-@st.cache_data(ttl=3600) 
-def search_coin_id(query):
     try:
-        url = f"https://api.coingecko.com/api/v3/search?query={query}"
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=5).json()
-        if r.get('coins'): return r['coins'][0]['id']
-    except: return None
+        genai = lazy_import("google.generativeai")
+        api_key = st.secrets.get("GEMINI_API_KEY", "")
+        if api_key: genai.configure(api_key=api_key)
+        return genai.GenerativeModel("gemini-pro", generation_config={"temperature": 0.2})
+    except Exception: log.exception("Gemini modeli oluşturulamadı")
     return None
 
-@st.cache_data(ttl=180)
-def get_coin_data(coin_id, currency):
-    try:
-        url = f"https://api.coingecko.com/api/v3/simple/price?ids={coin_id}&vs_currencies={currency}&include_24hr_change=true&include_24hr_vol=true"
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=5)
-        if r.status_code != 200: return None
-        data = r.json()
-        if coin_id in data: return data[coin_id]
-    except: return None
-    return None
+# Aynı soru/analiz cache'ten anında gelir; değilse cevap geldikçe sayfaya akıtılır
+def render_ai(prompt, key):
+    cached = AI_CACHE.get(key)
+    METRICS.inc("nexus_cache_requests_total", fn="gemini", result="hit" if cached else "miss")
+    if cached: st.markdown(cached, unsafe_allow_html=True)
+    else:
+        with METRICS.span("gemini"): st.write_stream(stream_answer(get_model(), prompt, key))
 
-@st.cache_data(ttl=86400) 
-def get_global_data():
-    try:
-        url = "https://api.coingecko.com/api/v3/global"
-        return requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=5).json()['data']
-    except: return None
+def ai_failed():
+    METRICS.inc("nexus_gemini_errors_total")
+    log.warning("Gemini çağrısı başarısız", exc_info=True)
+    st.error("Bağlantı hatası.")
 
-@st.cache_data(ttl=600)
-def get_top10_coins(currency):
-    try:
-        url = f"https://api.coingecko.com/api/v3/coins/markets?vs_currency={currency}&order=market_cap_desc&per_page=10&page=1&sparkline=false&price_change_percentage=1h,24h,7d"
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=5)
-        if r.status_code != 200: return [] 
-        return r.json()
-    except: return []
-
-@st.cache_data(ttl=1800)
-def get_chart_data(coin_id, currency, days):
-    try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/market_chart?vs_currency={currency}&days={days}"
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=5)
-        if r.status_code != 200: return pd.DataFrame()
-        data = r.json()
-        if 'prices' not in data: return pd.DataFrame()
-        df = pd.DataFrame(data['prices'], columns=['time', 'price'])
-        df['time'] = pd.to_datetime(df['time'], unit='ms')
-        return df
-    except: return pd.DataFrame()
+# --- METRİKLER ---
+# NEXUS_METRICS_PORT verilirse Prometheus /metrics ucu açılır. Sayfadaki panel sadece NEXUS_DEBUG=1 ile
+# çalışan süreçte ?debug=1 verilince görünür (üretimde sorgu parametresi tek başına yetmez).
+DEBUG_PANEL = os.environ.get("NEXUS_DEBUG") == "1"
+@st.cache_resource
+def start_metrics_server():
+    port = os.environ.get("NEXUS_METRICS_PORT")
+    return serve_metrics(int(port)) if port else None
+
+start_metrics_server()
+
+def render_debug_panel():
+    with st.expander("🛠 DEBUG: METRİKLER", expanded=True):
+        hist = METRICS.histograms()
+        st.caption("Süreler (sn)")
+        st.dataframe(pd.DataFrame(
+            [{"metrik": n, "etiket": ", ".join(f"{k}={v}" for k, v in l.items()), "adet": c, "ort": avg, "p50": p50, "p95": p95, "max": mx} for n, l, c, avg, p50, p95, mx in hist]
+        ), hide_index=True, use_container_width=True)
+        st.caption("Sayaçlar (cache hit/miss, upstream durum kodları, hatalar)")
+        st.dataframe(pd.DataFrame(
+            [{"metrik": n, "etiket": ", ".join(f"{k}={v}" for k, v in l.items()), "değer": v} for n, l, v in METRICS.counters()]
+        ), hide_index=True, use_container_width=True)
+        prom = METRICS.render_prometheus()
+        st.download_button("Prometheus (.txt)", prom, file_name="nexus_metrics.txt")
+        st.code(prom, language="text")
+
+# --- VERİ MOTORU ---
+# Fetcher'lar hata durumunda exception fırlatır; swr_cached son iyi değeri korur,
+# hiç değer yoksa default döner. 404 (bilinmeyen coin) geçerli bir "boş" cevaptır.
+@swr_cached(ttl=3600)
+def search_coin_id(query):
+    r = api_get("search", {"query": query})
+    r.raise_for_status()
+    coins = r.json().get('coins')
+    return coins[0]['id'] if coins else None
+
+# --- YEREL COIN İNDEKSİ ---
+# Tam coin listesi günde bir arka planda yenilenir; sıralama için ilk 250'nin piyasa değeri sırası alınır.
+@swr_cached(ttl=86400)
+def get_coin_index():
+    r = api_get("coins/list", timeout=15)
+    r.raise_for_status()
+    coins = r.json()
+    # Sıralama için ayrı çağrı yapılmaz; piyasa listesinin ilk sayfası zaten cache'te.
+    # Sayfa alınamadıysa sırasız indeks 24 saat cache'lenmez (sembol çakışmaları ve bulanık
+    # arama sıralamaya dayanır): hata fırlatılır, swr eski indeksi korur ve geri çekilerek yeniden dener.
+    ranks = {c['id']: c.get('market_cap_rank') for c in get_market_page(1)}
+    if not ranks: raise RuntimeError("market page 1 unavailable, coin index left unranked")
+    return CoinIndex(coins, ranks)
+
+# Yazılan metni coin id'ye çevirir. İndeks hazırsa ağa hiç gidilmez; değilse indeks arka
+# planda yüklenirken eski yol (simple/price -> /search) kullanılır.
+def resolve_coin_id(raw_input):
+    index = get_coin_index.peek()
+    if index is None:
+        EXECUTOR.submit(get_coin_index)
+        if get_coin_data(raw_input) is None: return search_coin_id(raw_input) or raw_input
+        return raw_input
+    return index.resolve(raw_input) or raw_input
+
+@swr_cached(ttl=180)
+def get_coin_data(coin_id):
+    data = fetch_price(coin_id, BASE)
+    if data: ALERTS.observe(coin_id, "price", data.get(BASE))
+    return data
+
+# --- KUR TABLOSU ---
+# Tüm fetcher'lar BASE (USD) ile çeker; diğer para birimleri okuma anında çevrilir.
+@swr_cached(ttl=600)
+def get_fx_rates():
+    r = api_get("exchange_rates")
+    r.raise_for_status()
+    return parse_rates(r.json())
+
+def fx_rate(currency):
+    if currency == BASE: return 1.0
+    return (get_fx_rates() or {}).get(currency)
+
+@swr_cached(ttl=86400)
+def get_global_data():
+    r = api_get("global")
+    r.raise_for_status()
+    return r.json()['data']
+
+# --- PİYASA LİSTESİ ---
+# /coins/markets 250'lik sayfalarla çekilir; 1000 coin = 4 paralel çağrı.
+MARKET_PAGE = 250
+
+@swr_cached(ttl=600, default=list)
+def get_market_page(page):
+    params = {"vs_currency": BASE, "order": "market_cap_desc", "per_page": MARKET_PAGE, "page": page, "sparkline": "false", "price_change_percentage": "1h,24h,7d"}
+    r = api_get("coins/markets", params)
+    r.raise_for_status()
+    coins = r.json()
+    if page == 1: PRICE_BATCHER.piggyback(["bitcoin"] + [c['id'] for c in coins[:10]])
+    ALERTS.observe_many({c['id']: c.get('current_price') for c in coins})
+    return coins
+
+def get_market_list(count):
+    pages = fan_out([(get_market_page, (p,)) for p in range(1, -(-count // MARKET_PAGE) + 1)])
+    return [c for page in pages if page for c in page][:count]
+
+def get_top10_coins():
+    return get_market_page(1)[:10]
+
+# --- TARAYICI İÇİN TOPLU 7 GÜNLÜK SERİ ---
+# Tek /coins/markets çağrısı 250 coin'in saatlik 7g sparkline'ını getirir.
+@swr_cached(ttl=600, default=list)
+def get_market_sparklines(count=250):
+    params = {"vs_currency": BASE, "order": "market_cap_desc", "per_page": count, "page": 1, "sparkline": "true", "price_change_percentage": "24h"}
+    r = api_get("coins/markets", params)
+    r.raise_for_status()
+    return r.json()
+
+# Grafik geçmişi diskteki ts_store'dan okunur; ağdan sadece eksik kuyruk çekilir.
+# Cache'te DataFrame değil salt okunur kayıt dizisi (int64 zaman + float64) tutulur;
+# DataFrame sadece çizim anında, çizilecek noktalar için kurulur (bkz. get_chart).
+EMPTY_LINE, EMPTY_OHLC = empty(LINE_COLS), empty(OHLC_COLS)
+
+@swr_cached(ttl=1800, default=EMPTY_LINE)
+def get_chart_data(coin_id, days):
+    spec = LINE_SPECS[days]
+    with STORE.lock("line", coin_id, BASE, spec.name):
+        arr = STORE.load("line", coin_id, BASE, spec.name, LINE_COLS)
+        gap = tail_gap(arr)
+        r = None
+        if gap is None or gap > spec.full_after:
+            r = api_get(f"coins/{coin_id}/market_chart", {"vs_currency": BASE, "days": spec.full_days})
+        elif gap > min(spec.step, FRESH):
+            params = {"vs_currency": BASE, "from": int(arr["time"][-1]) // 1000, "to": now_ms() // 1000}
+            r = api_get(f"coins/{coin_id}/market_chart/range", params)
+        if r is not None:
+            if r.status_code == 404: return EMPTY_LINE
+            r.raise_for_status()
+            arr = STORE.merge("line", coin_id, BASE, spec, LINE_COLS, r.json().get('prices', []), thin=True)
+    return window(arr, days)
 
 # --- PRO İÇİN OHLC (MUM) VERİSİ ---
-@st.cache_data(ttl=1800)
-def get_ohlc_data(coin_id, currency, days):
-    try:
-        url = f"https://api.coingecko.com/api/v3/coins/{coin_id}/ohlc?vs_currency={currency}&days={days}"
-        r = requests.get(url, headers={"User-Agent": "Mozilla/5.0"}, timeout=5)
-        if r.status_code != 200: return pd.DataFrame()
-        data = r.json()
-        df = pd.DataFrame(data, columns=['time', 'open', 'high', 'low', 'close'])
-        df['time'] = pd.to_datetime(df['time'], unit='ms')
-        return df
-    except: return pd.DataFrame()
+@swr_cached(ttl=1800, default=EMPTY_OHLC)
+def get_ohlc_data(coin_id, days):
+    spec = OHLC_SPECS[days]
+    with STORE.lock("ohlc", coin_id, BASE, spec.name):
+        arr = STORE.load("ohlc", coin_id, BASE, spec.name, OHLC_COLS)
+        gap = tail_gap(arr)
+        fetch_days = None
+        if gap is None or gap > spec.full_after: fetch_days = spec.full_days
+        elif gap > min(spec.step, FRESH): fetch_days = next((d for d in OHLC_DAYS[spec.name] if d * DAY >= gap), spec.full_days)
+        if fetch_days:
+            r = api_get(f"coins/{coin_id}/ohlc", {"vs_currency": BASE, "days": fetch_days})
+            if r.status_code == 404: return EMPTY_OHLC
+            r.raise_for_status()
+            arr = STORE.merge("ohlc", coin_id, BASE, spec, OHLC_COLS, r.json() or [])
+    return window(arr, days)
+
+# --- ALARMLAR ---
+# Fiyat alarmları her yeni fiyatta (canlı tick, get_coin_data, piyasa sayfası) indeksten
+# kontrol edilir. RSI alarmları saatlik seride (7G grafiği) poller ile hesaplanır.
+RSI_ALERT_DAYS = "7"
+
+@st.cache_resource
+def start_alerts():
+    engine = AlertEngine()
+    if LIVE_BASE == BASE: TICKS.subscribe(engine.observe_many)
+    return engine
+
+ALERTS = start_alerts()
+
+def observe_rsi(coin_id):
+    tech = calculate_indicators(get_chart_data(coin_id, RSI_ALERT_DAYS), key=(coin_id, RSI_ALERT_DAYS))
+    if tech: ALERTS.observe(coin_id, "rsi", tech['rsi'])
+
+# Alarmı olan ama kimsenin izlemediği coin'ler için: depo senkronu, toplu fiyat, RSI
+def check_alerts():
+    ALERTS.sync()
+    coins = ALERTS.coins("price")
+    if coins:
+        TICKS.watch(*coins)
+        for i in range(0, len(coins), PRICE_BATCHER.MAX_IDS):
+            quotes = PRICE_BATCHER.get_many(coins[i:i + PRICE_BATCHER.MAX_IDS], BASE)
+            ALERTS.observe_many({c: q.get(BASE) for c, q in quotes.items()})
+    for coin_id in ALERTS.coins("rsi"): observe_rsi(coin_id)
+
+# --- ARKA PLAN POLLER'I ---
+# Süreç başına tek poller; sabit işler + oturumların izlediği anahtarlar (sn cinsinden aralık).
+POLL_INTERVALS = {"check_alerts": 120, "refresh_feeds": 300, "get_fx_rates": 600, "get_market_page": 300, "get_coin_data": 120, "get_global_data": 1800, "get_chart_data": 900, "get_ohlc_data": 900, "get_market_sparklines": 600}
+
+@st.cache_resource
+def start_poller():
+    poller = MarketPoller()
+    poller.add(get_market_page, (1,), POLL_INTERVALS["get_market_page"])
+    poller.add(get_coin_data, ("bitcoin",), POLL_INTERVALS["get_coin_data"])
+    poller.add(get_fx_rates, (), POLL_INTERVALS["get_fx_rates"])
+    poller.add(get_global_data, (), POLL_INTERVALS["get_global_data"])
+    poller.add(NEWS.refresh_feeds, (), POLL_INTERVALS["refresh_feeds"])
+    poller.add(check_alerts, (), POLL_INTERVALS["check_alerts"])
+    return poller.start()
+
+POLLER = start_poller()
+
+# --- CANLI FİYAT ---
+# Akış (WebSocket / replay) süreç başına bir kez başlar; başlık fiyatı ve mini grafiğin ucu
+# taze bir tick varsa ondan okunur. Tick'ler baz para biriminde, çeviri aşağıda yapılır.
+@st.cache_resource
+def start_live_feed():
+    return LiveFeed(TICKS, make_source()).start()
+
+LIVE = start_live_feed()
+
+def live_quote(coin_id, data):
+    tick = TICKS.latest(coin_id) if data and LIVE_BASE == BASE else None
+    return {**data, BASE: tick[1]} if tick else data
+
+# Başlık fiyatının kaynağı: coin için taze tick varsa CANLI, akış bağlı ama tick yoksa
+# GECİKMELİ (REST fiyatı), bağlantı yoksa ÇEVRİMDIŞI. Akış kapalıysa rozet gösterilmez.
+LIVE_BADGES = {"live": ("#16c784", "● CANLI"), "connected": ("#f0b90b", "● GECİKMELİ"), "offline": ("gray", "○ ÇEVRİMDIŞI")}
+
+def live_badge(coin_id):
+    state = LIVE.status()
+    if state == "off" or LIVE_BASE != BASE: return ""
+    if TICKS.latest(coin_id): state = "live"
+    elif state == "live": state = "connected"
+    color, text = LIVE_BADGES[state]
+    return f"<span style='font-size:11px; color:{color}; vertical-align:middle;'>{text}</span>"
+
+
+# --- OKUMA ANINDA ÇEVİRİ ---
+# Kur yoksa (ilk yükleme / hata) None ya da boş tablo döner, panel "yükleniyor" gösterir.
+def get_quote(coin_id, currency, live=True):
+    q = get_coin_data(coin_id)
+    return convert_quote(live_quote(coin_id, q) if live else q, currency, fx_rate(currency))
+
+# Paylaşılan diziye dokunulmaz: canlı tick'ler eklenir, n_out verilirse LTTB ile seçilir
+# ve sadece kalan noktalar için çevrilmiş yeni bir DataFrame kurulur.
+def get_chart(coin_id, currency, days, live=False, n_out=None):
+    arr, rate = get_chart_data(coin_id, days), fx_rate(currency)
+    if rate is None or not len(arr): return pd.DataFrame()
+    t, p = arr['time'], arr['price']
+    if live and LIVE_BASE == BASE:
+        tt, tp = TICKS.ticks(coin_id, since_ms=int(t[-1]))
+        if len(tt): t, p = np.concatenate((t, tt)), np.concatenate((p, tp))
+    if n_out and len(t) > n_out:
+        idx = lttb_indices(t, p, n_out)
+        t, p = t[idx], p[idx]
+    return pd.DataFrame({'time': t.astype('datetime64[ms]'), 'price': p * rate})
+
+def get_ohlc(coin_id, currency, days):
+    arr, rate = get_ohlc_data(coin_id, days), fx_rate(currency)
+    if rate is None or not len(arr): return pd.DataFrame()
+    return pd.DataFrame({'time': arr['time'].astype('datetime64[ms]'), **{c: arr[c] * rate for c in OHLC_COLS}})
+
+# Göstergeler baz seri üzerinde (para biriminden bağımsız tek durum) hesaplanır, sonra çevrilir
+def get_indicators(coin_id, currency, days):
+    rate = fx_rate(currency)
+    if rate is None: return None
+    return convert_indicators(calculate_indicators(get_chart_data(coin_id, days), key=(coin_id, days)), rate)
+
+# --- PARALEL ÖN YÜKLEME ---
+# Modun ihtiyaç duyduğu tüm cache'li çağrılar aynı anda açılır; ardından gelen
+# seri çağrılar cache'ten döner. Soğuk rerun ≈ en yavaş tek istek kadar sürer.
+# Aynı anahtarlar poller'a "izleniyor" diye bildirilir; sonraki rerun'lar ağ beklemez.
+@METRICS.timed("prefetch")
+def prefetch_mode(mode, coin_id, currency, days):
+    calls = []
+    if mode == "TERMINAL":
+        calls = [
+            (get_market_page, (1,)),
+            (get_coin_data, (coin_id,)), (get_coin_data, ("bitcoin",)),
+            (get_chart_data, (coin_id, days)), (get_chart_data, ("bitcoin", days)),
+            (get_global_data, ()),
+        ]
+        TICKS.watch(coin_id, "bitcoin")
+    elif mode == "PRO TERMINAL":
+        calls = [
+            (get_market_page, (1,)), (get_coin_data, (coin_id,)),
+            (get_ohlc_data, (coin_id, days)), (get_chart_data, (coin_id, days)),
+        ]
+        TICKS.watch(coin_id)
+    elif mode == "SCREENER":
+        calls = [(get_market_sparklines, ())]
+    else:
+        count = st.session_state.get("portal_count", 250)
+        calls = [(get_market_page, (p,)) for p in range(1, -(-count // MARKET_PAGE) + 1)]
+    if currency != BASE: calls.append((get_fx_rates, ()))
+    for fn, args in calls: POLLER.watch(fn, args, POLL_INTERVALS[fn.__name__])
+    fan_out(calls)
+
+# --- HABERLER ---
+# Sadece bellekteki indeksten okunur (poller yeniler). coin_id yoksa ya da coin için
+# haber yoksa genel akışın en yenileri döner.
+NEWS_LIMIT = 8
+
+def get_news(coin_id=None, limit=NEWS_LIMIT):
+    if not coin_id: return NEWS.latest(limit)
+    symbol = name = None
+    index = get_coin_index.peek()
+    if index is not None and coin_id in index.by_id:
+        n = index.by_id[coin_id]
+        symbol, name = index.symbols[n], index.names[n]
+    return NEWS.lookup(coin_id, symbol, name, limit) or NEWS.latest(limit)
+
+def news_card(n, compact=False):
+    if compact: return f"<div style='background-color: #262730; padding: 10px; border-radius: 5px; margin-bottom: 10px; font-size: 12px;'><a href='{html.escape(n['link'])}' style='color: white; text-decoration: none;'>{html.escape(n['title'])}</a></div>"
+    return f"""<div class="news-card"><a href="{html.escape(n['link'])}" target="_blank" style="text-decoration: none; color: white; font-weight: bold;">{html.escape(n['title'])}</a></div>"""
+
+# --- TOPLULUK DEPOSU ---
+@st.cache_resource
+def get_feed():
+    return FeedStore()
+
+FEED = get_feed()
+
+# --- PORTAL TABLOSU ---
+PORTAL_PAGE_SIZE = 50
+PORTAL_CHANGE_COLS = ["price_change_percentage_1h_in_currency", "price_change_percentage_24h_in_currency", "price_change_percentage_7d_in_currency"]
+PORTAL_SORTS = {"Piyasa Değeri": "market_cap_rank", "Fiyat": "current_price", "1s %": PORTAL_CHANGE_COLS[0], "24s %": PORTAL_CHANGE_COLS[1], "7g %": PORTAL_CHANGE_COLS[2]}
+PORTAL_HEADER = """<div class="coin-header"><div style="flex:1.5;">COIN</div><div style="flex:2; display:flex; justify-content:flex-end;"><div style="width:30%; text-align:right;">FIYAT</div><div style="width:20%; text-align:right;">1s</div><div style="width:20%; text-align:right;">24s</div><div style="width:20%; text-align:right;">7g</div></div></div>"""
+
+def portal_row(r, curr_sym):
+    p = r.current_price or 0
+    price_fmt = f"{curr_sym}{p:,.2f}" if p > 1 else f"{curr_sym}{p:.6f}"
+    stats = ""
+    for ch in r[4:7]:
+        ch = 0 if ch is None or ch != ch else ch
+        stats += f'<div class="stat-col" style="color:{"#16c784" if ch > 0 else "#ea3943"};">%{ch:.1f}</div>'
+    rank = "" if r.market_cap_rank != r.market_cap_rank else int(r.market_cap_rank)
+    return (f'<div class="coin-row"><div class="row-left"><span class="coin-rank">{rank}</span>'
+            f'<img src="{html.escape(r.image or "")}" width="24" height="24" loading="lazy"><span class="coin-name">{html.escape(r.symbol.upper())}</span></div>'
+            f'<div class="row-right"><div class="price-col">{price_fmt}</div>{stats}</div></div>')
 
 # --- GRAFİK 1: BASİT (TERMINAL - ZOOM AYARLI) ---
-def create_mini_chart(df, price_change, currency_symbol, height=350):
+# width: grafiğin yaklaşık piksel genişliği; tarayıcıya en fazla bu kadar nokta gider
+@METRICS.timed("figure")
+def create_mini_chart(df, price_change, currency_symbol, height=350, width=700):
+    go = lazy_import("plotly.graph_objects")
     fig = go.Figure()
     if df.empty: return fig
     
@@ -224,6 +505,7 @@ def create_mini_chart(df, price_change, currency_symbol, height=350):
     min_p = df['price'].min()
     max_p = df['price'].max()
     padding = (max_p - min_p) * 0.05 if max_p != min_p else max_p * 0.01
+    df = downsample_line(df, point_budget(width))
     
     fig.add_trace(go.Scatter(x=df['time'], y=df['price'], mode='lines', line=dict(color=main_color, width=2), fill='tozeroy', fillcolor=fill_color))
     
@@ -241,7 +523,9 @@ def create_mini_chart(df, price_change, currency_symbol, height=350):
     return fig
 
 # --- GRAFİK 2: PRO (MUM ÇUBUKLARI) ---
+@METRICS.timed("figure")
 def create_pro_chart(df, coin_name, currency_symbol):
+    go = lazy_import("plotly.graph_objects")
     fig = go.Figure()
     if df.empty: return fig
     
@@ -262,6 +546,229 @@ def create_pro_chart(df, coin_name, currency_symbol):
     )
     return fig
 
+# --- PARÇALI YENİLEME (FRAGMENT) ---
+# Her panel kendi başına yeniden çalışır: içindeki bir widget'a dokunmak ya da run_every
+# süresinin dolması sadece o paneli çalıştırır ve gönderir, script'in geri kalanı çalışmaz.
+# Fiyat başlığı + grafik panelleri akış bağlıyken 5 sn'de, bağlı değilken (kapalı, kopuk,
+# yeniden bağlanıyor) 300 sn'de bir çalışır; o durumda veri sadece poller yenilediğinde değişir.
+# Aralık tam çalışmada seçilir; panel kendi başına çalışırken durum değişirse tam rerun istenir.
+LIVE_REFRESH = 5
+IDLE_REFRESH = 300
+LIVE_STATES = ("live", "connected")
+NEWS_REFRESH = 60
+FEED_REFRESH = 15
+GLOBAL_REFRESH = 300
+
+def selected_days():
+    return DAY_OPTIONS[st.session_state.get("day_opt", "24 Saat")]
+
+def candle_options(days):
+    step = pd.Timedelta(milliseconds=LINE_SPECS[days].step)
+    return [k for k, v in CANDLE_INTERVALS.items() if v is None or pd.Timedelta(v) > step]
+
+def live_fragment(fn):
+    st.session_state.live_fast = LIVE.status() in LIVE_STATES
+    return st.fragment(fn, run_every=LIVE_REFRESH if st.session_state.live_fast else IDLE_REFRESH)
+
+def check_live_state():
+    if (LIVE.status() in LIVE_STATES) != st.session_state.get("live_fast"): st.rerun()
+
+# Figür, girdileri (seri uzunluğu/son nokta, son tick, kur, ...) değişmediyse yeniden kurulmaz
+def series_stamp(arr):
+    return len(arr), int(arr['time'][-1]) if len(arr) else None
+
+def reuse_figure(key, sig, build):
+    cached = st.session_state.get("fig_" + key)
+    if cached is not None and cached[0] == sig: return cached[1]
+    fig = build()
+    st.session_state["fig_" + key] = (sig, fig)
+    return fig
+
+def day_selector():
+    return DAY_OPTIONS[st.radio("Süre:", list(DAY_OPTIONS), horizontal=True, label_visibility="collapsed", key="day_opt")]
+
+def terminal_charts(user_coin_id, curr, curr_sym):
+    check_live_state()
+    days_api = day_selector()
+    panels = st.columns(2)
+    for col, coin_id, key in ((panels[0], user_coin_id, "chart_term_1"), (panels[1], "bitcoin", "chart_term_2")):
+        data = get_quote(coin_id, curr)
+        if not data: continue
+        with col:
+            change = data.get(f'{curr}_24h_change', 0)
+            color = "#ea3943" if change < 0 else "#16c784"
+            h1, h2 = st.columns([1, 1])
+            h1.markdown(f"<h2 style='margin:0;'>{coin_id.upper()} {live_badge(coin_id)}</h2>", unsafe_allow_html=True)
+            h2.markdown(f"<h3 style='text-align:right; color:{color}; margin:0;'>{curr_sym}{data[curr]:,.2f} (%{change:.2f})</h3>", unsafe_allow_html=True)
+            tick = TICKS.latest(coin_id, max_age=float("inf")) if LIVE_BASE == BASE else None
+            sig = (coin_id, curr, days_api, fx_rate(curr), change, series_stamp(get_chart_data(coin_id, days_api)), tick and tick[0])
+            fig = reuse_figure(key, sig, lambda: create_mini_chart(get_chart(coin_id, curr, days_api, live=True, n_out=point_budget(700)), change, curr_sym))
+            st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False}, key=key)
+
+@st.fragment
+def ai_question_box(user_coin_id, curr):
+    with st.container(border=True):
+        st.caption(f"🤖 **NEXUS AI SOR**")
+        user_q = st.text_input("Soru:", placeholder="Destek neresi?", label_visibility="collapsed", key="q_term")
+        if st.button("GÖNDER", key="btn_term"):
+             if not st.secrets.get("GEMINI_API_KEY"): st.error("API Key Yok")
+             else:
+                 with st.spinner(".."):
+                     try:
+                         price = get_quote(user_coin_id, curr)[curr]
+                         ai_key = make_key("soru", user_coin_id, price, st.session_state.language, question=user_q)
+                         render_ai(f"Coin: {user_coin_id}. Fiyat: {price}. Soru: {user_q}. Kısa cevapla.", ai_key)
+                     except Exception: ai_failed()
+
+@st.fragment(run_every=GLOBAL_REFRESH)
+def global_cap_card(curr, curr_sym):
+    with st.container(border=True):
+        global_data = get_global_data()
+        if global_data:
+            total_cap = global_data['total_market_cap'][curr]
+            total_change = global_data['market_cap_change_percentage_24h_usd']
+            arrow = "⬆" if total_change > 0 else "⬇"
+            t_color = "#16c784" if total_change > 0 else "#ea3943"
+            if total_cap > 1_000_000_000_000: t_fmt = f"{total_cap/1_000_000_000_000:.2f} T"
+            else: t_fmt = f"{total_cap/1_000_000_000:.2f} B"
+            st.markdown(f"""<div class="box-content"><h3 style="color: gray; margin: 0; font-size: 13px;">GLOBAL MARKET CAP</h3><h1 style="color: white; margin: 5px 0; font-size: 26px;">{curr_sym}{t_fmt}</h1><h3 style="color: {t_color}; margin: 0; font-size: 18px;">{arrow} %{total_change:.2f}</h3></div>""", unsafe_allow_html=True)
+
+# Mum grafiği ve göstergeler aynı seriden üretildiği için tek panelde yenilenir
+def pro_chart_panel(user_coin_id, curr, curr_sym):
+    check_live_state()
+    user_data = get_quote(user_coin_id, curr)
+    if not user_data: return
+    u_change = user_data.get(f'{curr}_24h_change', 0)
+    u_vol = user_data.get(f'{curr}_24h_vol', 0)
+    u_color = "#ea3943" if u_change < 0 else "#16c784"
+
+    c1, c2, c3 = st.columns(3)
+    c1.markdown(f"## {user_coin_id.upper()} {live_badge(user_coin_id)}", unsafe_allow_html=True)
+    c2.markdown(f"<h3 style='color:{u_color}'>{curr_sym}{user_data[curr]:,.2f} (%{u_change:.2f})</h3>", unsafe_allow_html=True)
+    c3.metric("24s Hacim", f"{curr_sym}{u_vol:,.0f}")
+
+    s1, s2 = st.columns([1, 1])
+    with s1: days_api = day_selector()
+    # Mum aralığı: Otomatik = CoinGecko /ohlc; diğerleri çizgi serisinden sunucuda üretilir
+    # Serinin kendi adımından ince aralıklar sunulmaz (tek noktalı, gövdesiz mumlar üretir)
+    options = candle_options(days_api)
+    if st.session_state.get("candle_opt") not in options: st.session_state.candle_opt = options[0]
+    with s2: candle_opt = st.radio("Mum:", options, horizontal=True, label_visibility="collapsed", key="candle_opt")
+    tech = get_indicators(user_coin_id, curr, days_api)
+
+    # Grafik canlı tick kullanmaz; sadece seri, kur ya da seçim değişince yeniden kurulur
+    def build():
+        ohlc_df = get_ohlc(user_coin_id, curr, days_api)
+        line_df = get_chart(user_coin_id, curr, days_api)
+        if CANDLE_INTERVALS[candle_opt]: ohlc_df = resample_ohlc(line_df, CANDLE_INTERVALS[candle_opt])
+        elif ohlc_df.empty and not line_df.empty: ohlc_df = resample_ohlc(line_df, auto_interval(days_api))
+        if not ohlc_df.empty: return "chart_pro_candle", create_pro_chart(ohlc_df, user_coin_id.upper(), curr_sym)
+        return "chart_pro_line", create_mini_chart(line_df, u_change, curr_sym, height=500, width=1400)
+    sig = (user_coin_id, curr, days_api, candle_opt, fx_rate(curr), u_change,
+           series_stamp(get_ohlc_data(user_coin_id, days_api)), series_stamp(get_chart_data(user_coin_id, days_api)))
+    key, fig = reuse_figure("chart_pro", sig, build)
+    if key == "chart_pro_line": st.warning("Mum verisi alınamadı, Çizgi grafik gösteriliyor.")
+    st.plotly_chart(fig, use_container_width=True, key=key)
+
+    if tech:
+        st.markdown("### 📊 Teknik Göstergeler")
+        i1, i2, i3, i4 = st.columns(4)
+        i1.metric("RSI (14)", f"{tech['rsi']:.2f}", tech['rsi_msg'])
+        i2.metric("MACD", f"{tech['macd']:.4f}", f"{tech['macd_sig']:.4f}")
+        i3.metric("SMA (20)", f"{tech['sma20']:.2f}", tech['trend'])
+        i4.metric("Bollinger", "Band", f"{tech['upper_bb']:.2f} / {tech['lower_bb']:.2f}")
+
+@st.fragment(run_every=NEWS_REFRESH)
+def news_panel(coin_id=None, limit=NEWS_LIMIT, height=None, compact=False):
+    news = get_news(coin_id, limit)
+    with st.container(height=height) if height else st.container():
+        if news: st.markdown("".join(news_card(n, compact) for n in news), unsafe_allow_html=True)
+        else: st.caption("Haberler yükleniyor...")
+
+# Buton işleri callback'te yapılır; fragment yeniden çalışırken yeni durum zaten hazırdır
+def feed_post():
+    if FEED.post("Misafir", st.session_state.msg_portal):
+        st.session_state.feed_cursor = None
+        st.session_state.msg_portal = ""
+
+def feed_goto(cursor):
+    st.session_state.feed_cursor = cursor
+
+@st.fragment(run_every=FEED_REFRESH)
+def community_feed():
+    with st.container(border=True):
+        st.text_input("Yorum Yaz:", placeholder="Düşüncelerin...", key="msg_portal")
+        st.button("PAYLAŞ", use_container_width=True, key="btn_portal", on_click=feed_post)
+    # Sadece tek sayfa okunur ve tek HTML bloğu olarak gönderilir
+    posts, older = FEED.page(st.session_state.feed_cursor)
+    with st.container(height=380):
+        st.markdown("".join(f"""<div class="social-card"><span style="color:{st.session_state.theme_color}; font-weight:bold;">@{html.escape(p['user'])}</span> <span style="color:gray; font-size:10px;">{p['time']}</span><br>{html.escape(p['msg'])}</div>""" for p in posts), unsafe_allow_html=True)
+    f1, f2 = st.columns(2)
+    if st.session_state.feed_cursor is not None: f1.button("⏮ En yeni", use_container_width=True, key="feed_newest", on_click=feed_goto, args=(None,))
+    if older is not None: f2.button("Daha eski ▶", use_container_width=True, key="feed_older", on_click=feed_goto, args=(older,))
+
+# --- ALARM PANELİ ---
+# Alarmlar oturuma değil ?u=<kimlik> bağlantısına aittir; bağlantıyı saklayan alarmlarını geri bulur.
+ALERT_REFRESH = 15
+ALERT_METRICS = {"Fiyat": "price", "RSI (14)": "rsi"}
+ALERT_OPS = {"Üstünde": "above", "Altında": "below"}
+
+def alert_owner():
+    owner = st.query_params.get("u")
+    if not owner:
+        owner = st.query_params["u"] = uuid.uuid4().hex[:12]
+    return owner
+
+def alert_add(coin_id, curr):
+    metric = ALERT_METRICS[st.session_state.alert_metric]
+    value = st.session_state.alert_value
+    if not value: return
+    if metric == "price":
+        rate = fx_rate(curr)
+        if not rate: return
+        value /= rate
+    if ALERTS.add(alert_owner(), coin_id, metric, ALERT_OPS[st.session_state.alert_op], value) is None:
+        st.session_state.alert_error = f"En fazla {MAX_PER_OWNER} alarm kurulabilir; yeni alarm için eskilerden birini silin."
+        return
+    # İlk değer hemen verilir; koşul zaten sağlanıyorsa alarm bu anda tetiklenir
+    if metric == "price": ALERTS.observe(coin_id, "price", (get_coin_data(coin_id) or {}).get(BASE))
+    else: observe_rsi(coin_id)
+    ALERTS.flush()  # tetiklenme bu rerun'da bildirim olarak görünsün
+
+def alert_remove(alert_id):
+    ALERTS.remove(alert_owner(), alert_id)
+
+def alert_value(metric, v, rate, curr_sym):
+    return f"{v:.1f}" if metric == "rsi" else f"{curr_sym}{v * (rate or 1):,.2f}"
+
+def alert_label(a, rate, curr_sym):
+    arrow = "⬆" if a['op'] == "above" else "⬇"
+    return f"{a['coin'].upper()}{' RSI' if a['metric'] == 'rsi' else ''} {arrow} {alert_value(a['metric'], a['threshold'], rate, curr_sym)}"
+
+@st.fragment(run_every=ALERT_REFRESH)
+def alert_panel(user_coin_id, curr, curr_sym):
+    owner, rate = alert_owner(), fx_rate(curr)
+    # Yeni tetiklenmeler bildirim olarak gösterilir (oturum açılmadan öncekiler hariç)
+    events = ALERTS.events(owner, st.session_state.alert_seen or 0)
+    if events:
+        if st.session_state.alert_seen is not None:
+            for e in events: st.toast(f"🔔 {alert_label(e, rate, curr_sym)} · şimdi {alert_value(e['metric'], e['value'], rate, curr_sym)}")
+        st.session_state.alert_seen = events[-1]['id']
+    elif st.session_state.alert_seen is None: st.session_state.alert_seen = 0
+
+    st.selectbox("Metrik", list(ALERT_METRICS), key="alert_metric", label_visibility="collapsed")
+    a1, a2 = st.columns(2)
+    a1.selectbox("Yön", list(ALERT_OPS), key="alert_op", label_visibility="collapsed")
+    a2.number_input("Eşik", min_value=0.0, value=None, placeholder="Eşik", format="%.4f", key="alert_value", label_visibility="collapsed")
+    st.button(f"🔔 {user_coin_id.upper()} ALARMI KUR", use_container_width=True, key="alert_add", on_click=alert_add, args=(user_coin_id, curr))
+    # Callback içinde çizim yapılamaz; hata bir sonraki çizimde gösterilir
+    error = st.session_state.pop("alert_error", None)
+    if error: st.error(error)
+    for a in ALERTS.alerts(owner):
+        r1, r2 = st.columns([4, 1])
+        r1.caption(alert_label(a, rate, curr_sym) + (" · 🔔" if a['last_fired'] else ""))
+        r2.button("✕", key=f"alert_rm_{a['id']}", on_click=alert_remove, args=(a['id'],))
+
 # --- LAYOUT AYARI: YAN PANELLER GENİŞLETİLDİ ---
 # Eskiden [1, 4, 1] idi. Şimdi [1.2, 4, 1.2] yaparak yanlara daha çok yer verdik.
 layout_cols = [1.2, 4, 1.2] if st.session_state.app_mode in ["TERMINAL", "PRO TERMINAL"] else [1.5, 5]
@@ -270,17 +777,21 @@ col_nav = cols[0]
 col_main = cols[1]
 col_right = cols[2] if len(cols) > 2 else None
 
+coin_modes = st.session_state.app_mode in ["TERMINAL", "PRO TERMINAL"]
+prefetch_coin = resolve_coin_id(st.session_state.selected_coin.lower().strip()) if coin_modes else None
+prefetch_mode(st.session_state.app_mode, prefetch_coin, st.session_state.currency, selected_days())
+
 # --- SOL PANEL ---
 with col_nav:
     with st.container(border=True):
-        if logo_base64:
-            st.markdown(f"""<div class="logo-container"><img src="data:image/jpeg;base64,{logo_base64}" class="logo-img"><h1 class="logo-text">NEXUS</h1></div>""", unsafe_allow_html=True)
+        if logo_uri:
+            st.markdown(f"""<div class="logo-container"><img src="{logo_uri}" class="logo-img"><h1 class="logo-text">NEXUS</h1></div>""", unsafe_allow_html=True)
         else:
             st.markdown(f"<h1 style='color: {st.session_state.theme_color}; text-align: center; margin:0; font-size: 24px;'>🦁 NEXUS</h1>", unsafe_allow_html=True)
         st.markdown("---")
         
         st.caption("🌐 **MOD**")
-        mode_select = st.radio("Mod:", ["TERMINAL", "PRO TERMINAL", "PORTAL"], label_visibility="collapsed")
+        mode_select = st.radio("Mod:", MODES, index=MODES.index(st.session_state.app_mode), label_visibility="collapsed")
         if mode_select != st.session_state.app_mode:
             st.session_state.app_mode = mode_select
             st.rerun()
@@ -297,7 +808,7 @@ with col_nav:
             st.markdown("---")
             
             st.caption("🚀 **HIZLI ERİŞİM**")
-            top10_data = get_top10_coins(st.session_state.currency)
+            top10_data = get_top10_coins()
             if top10_data:
                 cols_quick = st.columns(3)
                 for i, coin in enumerate(top10_data[:10]):
@@ -306,20 +817,12 @@ with col_nav:
                         st.rerun()
             else: st.caption("Yükleniyor...")
 
-            st.markdown("---")
-            st.caption("⏳ **SÜRE**")
-            day_opt = st.radio("Süre:", ["24 Saat", "7 Gün", "1 Ay", "6 Ay"], horizontal=True, label_visibility="collapsed")
-            if day_opt == "24 Saat": days_api = "1"
-            elif day_opt == "7 Gün": days_api = "7"
-            elif day_opt == "1 Ay": days_api = "30"
-            else: days_api = "180"
-
         st.markdown("<br>", unsafe_allow_html=True)
         st.caption("🌍 **DİL**")
         lng = st.radio("Dil:", ["TR", "EN", "DE"], horizontal=True, label_visibility="collapsed")
         st.session_state.language = lng
         
-        if st.session_state.app_mode == "PORTAL":
+        if st.session_state.app_mode in ["PORTAL", "SCREENER"]:
             st.markdown("---")
             st.caption("⚙️ **AYARLAR**")
             curr_opt = st.selectbox("Para Birimi", ["USD", "TRY", "EUR"], label_visibility="collapsed")
@@ -336,64 +839,19 @@ with col_main:
         curr = st.session_state.currency
         curr_sym = "$" if curr == 'usd' else "₺" if curr == 'try' else "€"
         
-        user_coin_id = raw_input
-        user_data = get_coin_data(user_coin_id, curr)
-        if user_data is None:
-            found_id = search_coin_id(raw_input)
-            if found_id:
-                user_coin_id = found_id
-                user_data = get_coin_data(user_coin_id, curr)
-
-        btc_data = get_coin_data("bitcoin", curr)
+        user_coin_id = resolve_coin_id(raw_input)
+        user_data = get_quote(user_coin_id, curr, live=False)
+        btc_data = get_quote("bitcoin", curr, live=False)
         
         if user_data and btc_data:
-            c_chart1, c_chart2 = st.columns(2)
-            with c_chart1:
-                u_change = user_data.get(f'{curr}_24h_change', 0)
-                u_color = "#ea3943" if u_change < 0 else "#16c784"
-                cl1, cl2 = st.columns([1, 1])
-                cl1.markdown(f"<h2 style='margin:0;'>{user_coin_id.upper()}</h2>", unsafe_allow_html=True)
-                cl2.markdown(f"<h3 style='text-align:right; color:{u_color}; margin:0;'>{curr_sym}{user_data[curr]:,.2f} (%{u_change:.2f})</h3>", unsafe_allow_html=True)
-                u_df = get_chart_data(user_coin_id, curr, days_api)
-                st.plotly_chart(create_mini_chart(u_df, u_change, curr_sym), use_container_width=True, config={'displayModeBar': False}, key="chart_term_1")
-
-            with c_chart2:
-                b_change = btc_data.get(f'{curr}_24h_change', 0)
-                b_color = "#ea3943" if b_change < 0 else "#16c784"
-                cr1, cr2 = st.columns([1, 1])
-                cr1.markdown(f"<h2 style='margin:0;'>BITCOIN</h2>", unsafe_allow_html=True)
-                cr2.markdown(f"<h3 style='text-align:right; color:{b_color}; margin:0;'>{curr_sym}{btc_data[curr]:,.2f} (%{b_change:.2f})</h3>", unsafe_allow_html=True)
-                b_df = get_chart_data("bitcoin", curr, days_api)
-                st.plotly_chart(create_mini_chart(b_df, b_change, curr_sym), use_container_width=True, config={'displayModeBar': False}, key="chart_term_2")
+            live_fragment(terminal_charts)(user_coin_id, curr, curr_sym)
 
             c_bot1, c_bot2, c_bot3 = st.columns(3)
-            with c_bot1:
-                with st.container(border=True):
-                    st.caption(f"🤖 **NEXUS AI SOR**")
-                    user_q = st.text_input("Soru:", placeholder="Destek neresi?", label_visibility="collapsed", key="q_term")
-                    if st.button("GÖNDER", key="btn_term"):
-                         if not st.secrets.get("GEMINI_API_KEY"): st.error("API Key Yok")
-                         else:
-                             with st.spinner(".."):
-                                 try:
-                                     m = get_model()
-                                     r = m.generate_content(f"Coin: {user_coin_id}. Fiyat: {user_data[curr]}. Soru: {user_q}. Kısa cevapla.")
-                                     st.info(r.text)
-                                 except: pass
+            with c_bot1: ai_question_box(user_coin_id, curr)
             with c_bot2:
                 with st.container(border=True):
                     st.markdown("""<div class="box-content"><div class="ad-placeholder">REKLAM ALANI</div></div>""", unsafe_allow_html=True)
-            with c_bot3:
-                with st.container(border=True):
-                    global_data = get_global_data()
-                    if global_data:
-                        total_cap = global_data['total_market_cap'][curr]
-                        total_change = global_data['market_cap_change_percentage_24h_usd']
-                        arrow = "⬆" if total_change > 0 else "⬇"
-                        t_color = "#16c784" if total_change > 0 else "#ea3943"
-                        if total_cap > 1_000_000_000_000: t_fmt = f"{total_cap/1_000_000_000_000:.2f} T"
-                        else: t_fmt = f"{total_cap/1_000_000_000:.2f} B"
-                        st.markdown(f"""<div class="box-content"><h3 style="color: gray; margin: 0; font-size: 13px;">GLOBAL MARKET CAP</h3><h1 style="color: white; margin: 5px 0; font-size: 26px;">{curr_sym}{t_fmt}</h1><h3 style="color: {t_color}; margin: 0; font-size: 18px;">{arrow} %{total_change:.2f}</h3></div>""", unsafe_allow_html=True)
+            with c_bot3: global_cap_card(curr, curr_sym)
             
             if analyze_btn:
                  st.markdown("---")
@@ -402,16 +860,14 @@ with col_main:
                  else:
                      with st.spinner("Analiz Yapılıyor..."):
                          try:
-                             model = get_model()
-                             price_now = user_data[curr]
+                             price_now = get_quote(user_coin_id, curr)[curr]
                              simple_prompt = f"""
                              Coin: {user_coin_id.upper()}, Fiyat: {price_now} {curr.upper()}.
                              Yatırımcı için kısa, net ve anlaşılır bir durum özeti geç. Çok teknik terim kullanma. Yön ne tarafa?
                              Dil: {st.session_state.language}
                              """
-                             res = model.generate_content(simple_prompt)
-                             st.markdown(res.text, unsafe_allow_html=True)
-                         except: st.error("Bağlantı hatası.")
+                             render_ai(simple_prompt, make_key("temel", user_coin_id, price_now, st.session_state.language))
+                         except Exception: ai_failed()
         else:
             st.warning(f"⚠️ Veri alınamadı (Limit/Hata). Lütfen 1 dakika bekleyin.")
 
@@ -421,43 +877,15 @@ with col_main:
         curr = st.session_state.currency
         curr_sym = "$" if curr == 'usd' else "₺" if curr == 'try' else "€"
         
-        user_coin_id = raw_input
-        user_data = get_coin_data(user_coin_id, curr)
-        if user_data is None:
-            found_id = search_coin_id(raw_input)
-            if found_id:
-                user_coin_id = found_id
-                user_data = get_coin_data(user_coin_id, curr)
+        user_coin_id = resolve_coin_id(raw_input)
+        user_data = get_quote(user_coin_id, curr, live=False)
         
         if user_data:
-            u_change = user_data.get(f'{curr}_24h_change', 0)
-            u_vol = user_data.get(f'{curr}_24h_vol', 0)
-            u_color = "#ea3943" if u_change < 0 else "#16c784"
-            
-            c1, c2, c3 = st.columns(3)
-            c1.markdown(f"## {user_coin_id.upper()}")
-            c2.markdown(f"<h3 style='color:{u_color}'>{curr_sym}{user_data[curr]:,.2f} (%{u_change:.2f})</h3>", unsafe_allow_html=True)
-            c3.metric("24s Hacim", f"{curr_sym}{u_vol:,.0f}")
-            
-            ohlc_df = get_ohlc_data(user_coin_id, curr, days_api)
-            line_df = get_chart_data(user_coin_id, curr, days_api)
-            tech = calculate_indicators(line_df) 
-            
-            if not ohlc_df.empty:
-                st.plotly_chart(create_pro_chart(ohlc_df, user_coin_id.upper(), curr_sym), use_container_width=True, key="chart_pro_candle")
-            else:
-                st.warning("Mum verisi alınamadı, Çizgi grafik gösteriliyor.")
-                st.plotly_chart(create_mini_chart(line_df, u_change, curr_sym, height=500), use_container_width=True, key="chart_pro_line")
-            
-            if tech:
-                st.markdown("### 📊 Teknik Göstergeler")
-                i1, i2, i3, i4 = st.columns(4)
-                i1.metric("RSI (14)", f"{tech['rsi']:.2f}", tech['rsi_msg'])
-                i2.metric("MACD", f"{tech['macd']:.4f}", f"{tech['macd_sig']:.4f}")
-                i3.metric("SMA (20)", f"{tech['sma20']:.2f}", tech['trend'])
-                i4.metric("Bollinger", "Band", f"{tech['upper_bb']:.2f} / {tech['lower_bb']:.2f}")
+            live_fragment(pro_chart_panel)(user_coin_id, curr, curr_sym)
             
             if analyze_btn:
+                days_api = selected_days()
+                tech = get_indicators(user_coin_id, curr, days_api)
                 st.markdown("---")
                 st.subheader(f"🦁 NEXUS PRO: Advanced Market Analysis")
                 if not st.secrets.get("GEMINI_API_KEY"): st.error("API Key Yok")
@@ -465,8 +893,7 @@ with col_main:
                 else:
                     with st.spinner("Elliott Dalgaları ve Harmonik Formasyonlar Taranıyor..."):
                         try:
-                            model = get_model()
-                            price_now = user_data[curr]
+                            price_now = get_quote(user_coin_id, curr)[curr]
                             expert_prompt = f"""
                             Sen John Murphy ve Scott Carney'in öğretileriyle donatılmış, Elliott Dalgalarını sayabilen, Harmonik formasyonları görebilen elit bir "Teknik Analist"sin.
                             DİL: {st.session_state.language}
@@ -487,80 +914,82 @@ with col_main:
                             
                             **ÖNEMLİ:** En sona "BASİT ÖZET" başlığı aç ve orada bu teknik detayları bilmeyen biri için 1 cümlelik net sonuç yaz.
                             """
-                            res = model.generate_content(expert_prompt)
-                            st.markdown(res.text, unsafe_allow_html=True)
-                        except: st.error("Bağlantı hatası.")
+                            render_ai(expert_prompt, make_key("pro", user_coin_id, price_now, st.session_state.language, tech))
+                        except Exception: ai_failed()
         else:
             st.warning("Veri yükleniyor...")
 
-    # === MOD 3: PORTAL (CMC LİSTESİ) ===
+    # === MOD 3: SCREENER (ÇOKLU COIN TARAYICI) ===
+    elif st.session_state.app_mode == "SCREENER":
+        st.markdown(f"<h3 style='color:{st.session_state.theme_color}'>🧭 TEKNİK TARAYICI</h3>", unsafe_allow_html=True)
+        curr_sym = "$" if st.session_state.currency == 'usd' else "₺" if st.session_state.currency == 'try' else "€"
+        markets = [c for c in get_market_sparklines() if (c.get('sparkline_in_7d') or {}).get('price')]
+        rate = fx_rate(st.session_state.currency)
+        res = screener.compute(screener.to_matrix([c['sparkline_in_7d']['price'] for c in markets])) if markets and rate else None
+        if res:
+            sig = screener.signals(res)
+            table = pd.DataFrame({
+                "#": [c.get('market_cap_rank') for c in markets],
+                "Coin": [c['symbol'].upper() for c in markets],
+                "Fiyat": [c['current_price'] for c in markets],
+                "24s %": [c.get('price_change_percentage_24h_in_currency') for c in markets],
+                "RSI (14)": res['rsi'], "RSI Sinyal": sig['rsi_msg'],
+                "MACD": sig['macd_msg'], "Trend (SMA20)": sig['trend'],
+                "BB Üst": res['upper_bb'], "BB Alt": res['lower_bb'],
+            })
+            table = convert_frame(table, ["Fiyat", "BB Üst", "BB Alt"], rate)
+            f1, f2, f3 = st.columns(3)
+            rsi_f = f1.multiselect("RSI", ["AŞIRI ALIM", "NÖTR", "AŞIRI SATIM"], placeholder="RSI: hepsi")
+            macd_f = f2.multiselect("MACD", ["AL", "SAT"], placeholder="MACD: hepsi")
+            trend_f = f3.multiselect("Trend", ["YÜKSELİŞ", "DÜŞÜŞ"], placeholder="Trend: hepsi")
+            if rsi_f: table = table[table["RSI Sinyal"].isin(rsi_f)]
+            if macd_f: table = table[table["MACD"].isin(macd_f)]
+            if trend_f: table = table[table["Trend (SMA20)"].isin(trend_f)]
+            st.caption(f"{len(table)} / {len(markets)} coin · 7 günlük saatlik veri")
+            st.dataframe(table, hide_index=True, use_container_width=True, height=640, column_config={
+                "Fiyat": st.column_config.NumberColumn(format=f"{curr_sym}%.4f"),
+                "24s %": st.column_config.NumberColumn(format="%.2f"),
+                "RSI (14)": st.column_config.NumberColumn(format="%.1f"),
+                "BB Üst": st.column_config.NumberColumn(format="%.4f"),
+                "BB Alt": st.column_config.NumberColumn(format="%.4f"),
+            })
+        else: st.info("⚠️ Veri yükleniyor...")
+
+    # === MOD 4: PORTAL (CMC LİSTESİ) ===
     else:
-        st.markdown(f"<h3 style='color:{st.session_state.theme_color}'>🏆 TOP 10 PIYASA</h3>", unsafe_allow_html=True)
-        top10 = get_top10_coins(st.session_state.currency)
-        curr_sym = "$" if st.session_state.currency == 'usd' else "₺"
-        
-        if top10:
-            st.markdown(f"""
-            <div class="coin-header">
-                <div style="flex:1.5;">COIN</div>
-                <div style="flex:2; display:flex; justify-content:flex-end;">
-                    <div style="width:30%; text-align:right;">FIYAT</div>
-                    <div style="width:20%; text-align:right;">1s</div>
-                    <div style="width:20%; text-align:right;">24s</div>
-                    <div style="width:20%; text-align:right;">7g</div>
-                </div>
-            </div>
-            """, unsafe_allow_html=True)
-
-            for idx, coin in enumerate(top10[:10]): 
-                p = coin['current_price']
-                price_fmt = f"{curr_sym}{p:,.2f}" if p > 1 else f"{curr_sym}{p:.6f}"
-                p1 = coin.get('price_change_percentage_1h_in_currency') or 0
-                p24 = coin.get('price_change_percentage_24h_in_currency') or 0
-                p7 = coin.get('price_change_percentage_7d_in_currency') or 0
-                c1 = "#16c784" if p1 > 0 else "#ea3943"
-                c24 = "#16c784" if p24 > 0 else "#ea3943"
-                c7 = "#16c784" if p7 > 0 else "#ea3943"
-
-                st.markdown(f"""
-                <div class="coin-row">
-                    <div class="row-left">
-                        <span class="coin-rank">{idx+1}</span>
-                        <img src="{coin['image']}" width="24" height="24">
-                        <span class="coin-name">{coin['symbol'].upper()}</span>
-                    </div>
-                    <div class="row-right">
-                        <div class="price-col">{price_fmt}</div>
-                        <div class="stat-col" style="color:{c1};">%{p1:.1f}</div>
-                        <div class="stat-col" style="color:{c24};">%{p24:.1f}</div>
-                        <div class="stat-col" style="color:{c7};">%{p7:.1f}</div>
-                    </div>
-                </div>
-                """, unsafe_allow_html=True)
+        st.markdown(f"<h3 style='color:{st.session_state.theme_color}'>🏆 PİYASA</h3>", unsafe_allow_html=True)
+        curr_sym = "$" if st.session_state.currency == 'usd' else "₺" if st.session_state.currency == 'try' else "€"
+        s1, s2, s3, s4 = st.columns([1, 1.4, 1, 1])
+        count = s1.selectbox("Coin sayısı", [100, 250, 500, 1000], index=1, key="portal_count")
+        sort_label = s2.selectbox("Sırala", list(PORTAL_SORTS), key="portal_sort")
+        descending = s3.toggle("Azalan", value=PORTAL_SORTS[sort_label] != "market_cap_rank", key="portal_desc")
+        market = get_market_list(count)
+        rate = fx_rate(st.session_state.currency)
+
+        if market and rate:
+            with METRICS.span("render"):
+                table = pd.DataFrame(market, columns=["market_cap_rank", "symbol", "image", "current_price", *PORTAL_CHANGE_COLS])
+                table = convert_frame(table, ["current_price"], rate)
+                table = table.sort_values(PORTAL_SORTS[sort_label], ascending=not descending, na_position="last")
+                pages = max(1, -(-len(table) // PORTAL_PAGE_SIZE))
+                page = s4.number_input(f"Sayfa (/{pages})", min_value=1, max_value=pages, value=1, step=1, key="portal_page")
+                rows = table.iloc[(page - 1) * PORTAL_PAGE_SIZE: page * PORTAL_PAGE_SIZE]
+                # Tüm sayfa tek bir HTML bloğu olarak gönderilir (satır başına ayrı element yok)
+                st.markdown(PORTAL_HEADER + "".join(portal_row(r, curr_sym) for r in rows.itertuples(index=False)), unsafe_allow_html=True)
+                st.caption(f"{len(table)} coin · sayfa {page}/{pages}")
         else: st.info("⚠️ Veri yükleniyor...")
 
         st.markdown("---")
         c_news, c_social = st.columns([1, 1])
         with c_news:
             st.subheader("📰 GÜNDEM")
-            news_items = get_news("crypto market")
-            with st.container(height=500):
-                for n in news_items:
-                    st.markdown(f"""<div class="news-card"><a href="{n['link']}" target="_blank" style="text-decoration: none; color: white; font-weight: bold;">{n['title']}</a></div>""", unsafe_allow_html=True)
+            news_panel(limit=30, height=500)
         with c_social:
             st.subheader("💬 TOPLULUK")
-            with st.container(border=True):
-                user_msg = st.text_input("Yorum Yaz:", placeholder="Düşüncelerin...", key="msg_portal")
-                if st.button("PAYLAŞ", use_container_width=True, key="btn_portal"):
-                    if user_msg:
-                        st.session_state.posts.insert(0, {"user": "Misafir", "msg": user_msg, "time": datetime.datetime.now().strftime("%H:%M")})
-                        st.rerun()
-            with st.container(height=380):
-                for p in st.session_state.posts:
-                    st.markdown(f"""<div class="social-card"><span style="color:{st.session_state.theme_color}; font-weight:bold;">@{p['user']}</span> <span style="color:gray; font-size:10px;">{p['time']}</span><br>{p['msg']}</div>""", unsafe_allow_html=True)
+            community_feed()
 
 # --- SAĞ PANEL ---
-if col_right and st.session_state.app_mode != "PORTAL":
+if col_right and st.session_state.app_mode not in ["PORTAL", "SCREENER"]:
     with col_right:
         with st.container(border=True):
             st.markdown("#### ⚙️ Ayarlar")
@@ -571,8 +1000,13 @@ if col_right and st.session_state.app_mode != "PORTAL":
             st.session_state.theme_color = THEMES[thm]
             st.markdown("---")
             target = user_coin_id if 'user_coin_id' in locals() else 'bitcoin'
+            if st.session_state.app_mode == "TERMINAL":
+                st.markdown("#### 🔔 Alarmlar")
+                alert_panel(target, st.session_state.currency, "$" if st.session_state.currency == 'usd' else "₺" if st.session_state.currency == 'try' else "€")
+                st.markdown("---")
             st.markdown(f"#### 📰 Haberler")
-            news = get_news(target)
-            if news:
-                for n in news:
-                    st.markdown(f"<div style='background-color: #262730; padding: 10px; border-radius: 5px; margin-bottom: 10px; font-size: 12px;'><a href='{n['link']}' style='color: white; text-decoration: none;'>{n['title']}</a></div>", unsafe_allow_html=True)
+            news_panel(target, compact=True)
+
+# --- RERUN SÜRESİ + DEBUG PANELİ ---
+METRICS.observe("nexus_rerun_seconds", time.perf_counter() - RERUN_T0, mode=st.session_state.app_mode)
+if DEBUG_PANEL and st.query_params.get("debug") == "1": render_debug_panel()
@@ -0,0 +1,293 @@
+import argparse
+import itertools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from indicators import FAST, RSI_WINDOW, SIGNAL, SLOW, SMA_WINDOW
+from screener import rolling_mean, rolling_std
+from ts_store import DATA_DIR, DAY, HOUR, LINE_COLS, STORE
+
+# --- SİNYAL BACKTEST'İ ---
+# calculate_indicators'daki kurallar (MACD AL/SAT, RSI AŞIRI SATIM/ALIM, SMA20 trend,
+# Bollinger bantları) ts_store'daki geçmiş üzerinde tekrar oynatılır. Her kural sadece
+# long/nakit pozisyon üretir; pozisyon t anındaki kapanışla alınır, t+1 getirisine uygulanır.
+# Hesaplar (coin x zaman) matrisleri üzerinde tamamen vektöreldir; parametre seti x coin
+# parçaları bir süreç havuzuna dağıtılır.
+#   python backtest.py --gran 1h --days 90 --workers 4
+#   python backtest.py --synthetic 100 --days 180 --grid 50     (ağ/depo olmadan hız ölçümü)
+
+EWM_BLOCK = 128   # kapalı form EWM'de taşma olmadan işlenen blok uzunluğu
+COIN_CHUNK = 64
+
+
+# --- VERİ ---
+def load_store(gran="1h", days=90, limit=None):
+    root = os.path.join(STORE.root, "line", "usd")
+    coins = sorted(os.listdir(root)) if os.path.isdir(root) else []
+    series = {}
+    for coin in coins:
+        arr = STORE.load("line", coin, "usd", gran, LINE_COLS)
+        if len(arr): series[coin] = arr[arr["time"] >= arr["time"][-1] - days * DAY]
+        if limit and len(series) >= limit: break
+    return align(series, {"5m": 5 * 60_000, "1h": HOUR, "1d": DAY}[gran])
+
+
+# Seriler ortak bir zaman ızgarasına yerleştirilir; eksik kovalar NaN kalır
+def align(series, step):
+    if not series: return [], np.empty((0, 0))
+    start = min(int(a["time"][0]) for a in series.values()) // step
+    end = max(int(a["time"][-1]) for a in series.values()) // step
+    out = np.full((len(series), end - start + 1), np.nan)
+    for i, a in enumerate(series.values()):
+        out[i, a["time"] // step - start] = a["price"]
+    return list(series), out
+
+
+def synthetic(n_coins, n_steps, seed=0):
+    rng = np.random.default_rng(seed)
+    vol = rng.uniform(0.005, 0.03, (n_coins, 1))
+    steps = rng.standard_normal((n_coins, n_steps)) * vol + rng.normal(0, 0.0005, (n_coins, 1))
+    return [f"coin{i}" for i in range(n_coins)], 100 * np.exp(np.cumsum(steps, axis=1))
+
+
+# --- VEKTÖREL GÖSTERGELER ---
+# adjust=False EWM: y_t = w*y_{t-1} + a*x_t. Blok içinde kapalı form (cumsum), bloklar arası
+# tek bir taşıma; zamanda Python döngüsü blok sayısı kadardır (screener.ewm'de adım sayısı kadar).
+# Aradaki boşluklar önceki fiyatla doldurulur; baştaki NaN'lar NaN kalır.
+def ewm(x, span):
+    a = 2 / (span + 1)
+    w = 1 - a
+    x = _ffill(x)
+    lead = np.isnan(x)
+    first = x[np.arange(len(x)), np.argmax(~lead, axis=1)]
+    x = np.where(lead, first[:, None], x)
+    out = np.empty_like(x)
+    carry = x[:, 0]
+    for s in range(0, x.shape[1], EWM_BLOCK):
+        blk = x[:, s:s + EWM_BLOCK]
+        k = np.arange(1, blk.shape[1] + 1)
+        y = (carry[:, None] + np.cumsum(blk * (a * w ** -k), axis=1)) * w ** k
+        out[:, s:s + blk.shape[1]] = y
+        carry = y[:, -1]
+    out[lead] = np.nan
+    return out
+
+
+def _ffill(x):
+    idx = np.where(np.isnan(x), 0, np.arange(x.shape[1]))
+    np.maximum.accumulate(idx, axis=1, out=idx)
+    out = x[np.arange(x.shape[0])[:, None], idx]
+    return out
+
+
+# Giriş (1) / çıkış (0) olayları arasında pozisyonu taşır
+def _hold(enter, exit_):
+    ev = np.where(enter, 1.0, np.where(exit_, 0.0, np.nan))
+    ev[:, 0] = np.where(np.isnan(ev[:, 0]), 0.0, ev[:, 0])
+    return _ffill(ev)
+
+
+# Her kural sadece kendi parametrelerine bağlıdır; ızgarada aynı alt kümeyi paylaşan setler tek kez koşar
+RULE_PARAMS = {
+    "macd": ("fast", "slow", "signal"),
+    "rsi": ("rsi", "rsi_low", "rsi_high"),
+    "trend": ("sma",),
+    "bb": ("sma", "bb_k"),
+}
+
+
+# memo: aynı coin parçası için hesaplanmış EWM/kayan pencere serileri (süreç içinde paylaşılır)
+def _cached(memo, key, fn):
+    if key not in memo: memo[key] = fn()
+    return memo[key]
+
+
+def _rsi(prices, w):
+    delta = np.diff(prices, axis=1, prepend=np.nan)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[np.isnan(delta)] = loss[np.isnan(delta)] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100 - 100 / (1 + rolling_mean(gain, w) / rolling_mean(loss, w))
+
+
+def positions(prices, rule, p, memo=None):
+    memo = {} if memo is None else memo
+    sma = lambda: _cached(memo, ("sma", p["sma"]), lambda: rolling_mean(prices, p["sma"]))
+    with np.errstate(invalid="ignore"):
+        if rule == "macd":
+            macd = _cached(memo, ("macd", p["fast"], p["slow"]),
+                           lambda: _cached(memo, ("ewm", p["fast"]), lambda: ewm(prices, p["fast"])) -
+                           _cached(memo, ("ewm", p["slow"]), lambda: ewm(prices, p["slow"])))
+            return (macd > ewm(macd, p["signal"])).astype(float)
+        if rule == "rsi":
+            rsi = _cached(memo, ("rsi", p["rsi"]), lambda: _rsi(prices, p["rsi"]))
+            return _hold(rsi < p["rsi_low"], rsi > p["rsi_high"])
+        if rule == "trend":
+            return (prices > sma()).astype(float)
+        if rule == "bb":
+            band = p["bb_k"] * _cached(memo, ("std", p["sma"]), lambda: rolling_std(prices, p["sma"]))
+            return _hold(prices < sma() - band, prices > sma() + band)
+    raise ValueError(f"bilinmeyen kural: {rule}")
+
+
+# --- PERFORMANS ---
+def evaluate(prices, pos, fee=0.0, memo=None):
+    memo = {} if memo is None else memo
+    with np.errstate(invalid="ignore", divide="ignore"):
+        logret = _cached(memo, ("logret",), lambda: np.nan_to_num(np.diff(np.log(prices), axis=1)))
+    held = pos[:, :-1]
+    # Brüt eğri hem özsermaye hem işlem getirisi için kullanılır; maliyet ayrıca düşülür
+    curve = np.zeros((len(prices), held.shape[1] + 1))
+    np.cumsum(held * logret, axis=1, out=curve[:, 1:])
+    equity = curve[:, 1:]
+    if fee: equity = equity - fee * np.cumsum(np.abs(np.diff(pos, axis=1, prepend=0.0))[:, :-1], axis=1)
+    peak = np.maximum.accumulate(np.maximum(equity, 0.0), axis=1)
+    drawdown = 1 - np.exp(equity - peak).min(axis=1)
+
+    # İşlem bazında isabet: giriş->çıkış arası log getiri > 0
+    edge = np.diff(np.pad(held, ((0, 0), (1, 1))), axis=1)
+    rows_in, t_in = np.nonzero(edge > 0)
+    _, t_out = np.nonzero(edge < 0)
+    trade = curve[rows_in, t_out] - curve[rows_in, t_in]
+    trades = np.bincount(rows_in, minlength=len(prices))
+    wins = np.bincount(rows_in, weights=trade > 0, minlength=len(prices))
+    return {
+        "return": np.expm1(equity[:, -1]) if equity.shape[1] else np.zeros(len(prices)),
+        "max_drawdown": drawdown if equity.shape[1] else np.zeros(len(prices)),
+        "trades": trades,
+        "hit_rate": np.where(trades > 0, wins / np.maximum(trades, 1), np.nan),
+        "exposure": held.mean(axis=1),
+    }
+
+
+# --- PARAMETRE IZGARASI ---
+DEFAULT = {"rsi": RSI_WINDOW, "rsi_low": 30, "rsi_high": 70, "sma": SMA_WINDOW,
+           "fast": FAST, "slow": SLOW, "signal": SIGNAL, "bb_k": 2.0}
+
+
+# Kural grupları ayrı eksenlerden seçilir; n set her kural için n tekil iş verir (grup yetiyorsa:
+# MACD 60, RSI 80, SMA/BB 100 kombinasyon). SMA uzunluğu trend ve Bollinger kurallarında ortaktır.
+GRID_AXES = {
+    "macd": [dict(fast=f, slow=s, signal=g) for f, s, g in itertools.product((8, 10, 12, 14, 16), (21, 26, 30, 35), (7, 9, 12))],
+    "rsi": [dict(rsi=w, rsi_low=lo, rsi_high=hi) for w, lo, hi in itertools.product((7, 10, 14, 21, 28), (20, 25, 30, 35), (65, 70, 75, 80))],
+    "sma": [dict(sma=w, bb_k=k) for w, k in zip(range(5, 205, 2), itertools.cycle((1.5, 2.0, 2.5)))],
+}
+
+
+def grid(n):
+    # Varsayılan set her zaman ilk sırada; geri kalanı her grupta eksenlere eşit aralıklarla yayılır
+    picks = []
+    for combos in GRID_AXES.values():
+        combos = [c for c in combos if any(DEFAULT[k] != v for k, v in c.items())]
+        idx = np.linspace(0, len(combos) - 1, min(len(combos), max(0, n - 1))).astype(int)
+        picks.append([combos[i] for i in idx])
+    return [dict(DEFAULT)] + [dict(DEFAULT, **{k: v for g in picks for k, v in g[i % len(g)].items()}) for i in range(max(0, n - 1))]
+
+
+# --- SÜREÇ HAVUZU ---
+# Fiyat matrisi her işçiye initializer ile bir kez gider; görevler sadece (coin aralığı,
+# kural, parametreler) taşır. Aynı coin aralığındaki göstergeler işçi içinde tekrar kullanılır.
+_PRICES = None
+_MEMO = {}
+
+
+def _init(prices):
+    global _PRICES
+    _PRICES = prices
+    _MEMO.clear()
+
+
+def _task(args):
+    lo, hi, jobs, fee = args
+    prices = _PRICES[lo:hi]
+    memo = _MEMO.setdefault((lo, hi), {})
+    return lo, [(rule, p, evaluate(prices, positions(prices, rule, p, memo), fee, memo)) for rule, p in jobs]
+
+
+def jobs_for(params):
+    seen = {}
+    for p in params:
+        for rule, keys in RULE_PARAMS.items():
+            seen.setdefault((rule, tuple(p[k] for k in keys)), (rule, {k: p[k] for k in keys}))
+    return list(seen.values())
+
+
+def run(coins, prices, params, workers=None, fee=0.0):
+    workers = workers or os.cpu_count() or 1
+    jobs = jobs_for(params)
+    # Her coin parçası için işler işçi sayısının birkaç katı kadar dilime bölünür
+    per = max(1, len(jobs) // (4 * workers))
+    tasks = [(lo, min(lo + COIN_CHUNK, len(coins)), jobs[j:j + per], fee)
+             for lo in range(0, len(coins), COIN_CHUNK) for j in range(0, len(jobs), per)]
+    if workers == 1:
+        _init(prices)
+        done = map(_task, tasks)
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init, initargs=(prices,))
+        done = pool.map(_task, tasks)
+    results = {}
+    try:
+        for lo, out in done:
+            for rule, p, metrics in out:
+                slot = results.setdefault((rule, json.dumps(p, sort_keys=True)), {m: np.full(len(coins), np.nan) for m in metrics})
+                for m, v in metrics.items(): slot[m][lo:lo + len(v)] = v
+    finally:
+        if workers == 1: _MEMO.clear()
+        else: pool.shutdown()
+    return results
+
+
+def summarize(results):
+    rows = []
+    for (rule, key), m in results.items():
+        rows.append({"rule": rule, "params": json.loads(key),
+                     "mean_return": float(np.nanmean(m["return"])), "median_return": float(np.nanmedian(m["return"])),
+                     "hit_rate": float(np.nanmean(m["hit_rate"])) if np.isfinite(m["hit_rate"]).any() else float("nan"),
+                     "max_drawdown": float(np.nanmean(m["max_drawdown"])), "trades": int(np.nansum(m["trades"])),
+                     "exposure": float(np.nanmean(m["exposure"]))})
+    return sorted(rows, key=lambda r: -r["mean_return"])
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--gran", default="1h", choices=["5m", "1h", "1d"], help="ts_store çözünürlüğü")
+    ap.add_argument("--days", type=int, default=90)
+    ap.add_argument("--coins", type=int, default=None, help="en fazla coin sayısı")
+    ap.add_argument("--synthetic", type=int, default=0, help="depo yerine N coin'lik rastgele yürüyüş")
+    ap.add_argument("--grid", type=int, default=50, help="parametre seti sayısı")
+    ap.add_argument("--workers", type=int, default=None)
+    ap.add_argument("--fee", type=float, default=0.001, help="pozisyon değişimi başına maliyet (oran)")
+    ap.add_argument("--top", type=int, default=10)
+    ap.add_argument("--json", help="tüm sonuçları bu dosyaya yaz")
+    args = ap.parse_args()
+
+    if args.synthetic:
+        steps = args.days * {"5m": 288, "1h": 24, "1d": 1}[args.gran]
+        coins, prices = synthetic(args.synthetic, steps)
+    else:
+        coins, prices = load_store(args.gran, args.days, args.coins)
+    if not coins:
+        raise SystemExit(f"{DATA_DIR} altında {args.gran} seri yok (önce uygulamayı çalıştırın ya da --synthetic kullanın)")
+
+    params = grid(args.grid)
+    t = time.perf_counter()
+    rows = summarize(run(coins, prices, params, args.workers, args.fee))
+    took = time.perf_counter() - t
+    print(f"{len(coins)} coin x {prices.shape[1]} nokta x {len(params)} parametre seti "
+          f"({len(rows)} tekil kural/parametre): {took:.2f}s")
+    print(f"{'kural':<6} {'ort. getiri':>11} {'medyan':>8} {'isabet':>7} {'maks DD':>8} {'işlem':>7}  parametreler")
+    for r in rows[:args.top]:
+        p = " ".join(f"{k}={v}" for k, v in r["params"].items())
+        print(f"{r['rule']:<6} {r['mean_return']:>11.2%} {r['median_return']:>8.2%} {r['hit_rate']:>7.1%} "
+              f"{r['max_drawdown']:>8.1%} {r['trades']:>7}  {p}")
+    if args.json:
+        with open(args.json, "w") as f: json.dump(rows, f, indent=1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+import argparse
+import os
+import random
+import sqlite3
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from alerts import SCHEMA, AlertEngine, ThresholdBook  # noqa: E402
+
+TARGET = 100_000
+
+# --- ALARM MOTORU BENCHMARK'I ---
+# N alarm C coin'e dağıtılır (başlangıç fiyatının ±%20'si, yarısı üstünde yarısı altında).
+# Coin'lere sırayla rastgele yürüyüş tick'leri verilir. Raporlananlar:
+#   tick/s      : saniyede işlenen fiyat güncellemesi (tick yolu; tetiklenme yazımı arka planda)
+#   kesilen     : tick'lerde gerçekten kesilen eşik sayısı (tetiklenen + bekleme süresinde bastırılan)
+#   yazım       : kuyruktaki tetiklenmelerin depoya yazılması için tick'lerden sonra beklenen süre
+#   tarama      : aynı tick'lerin bir kısmı için her alarmı tek tek kontrol eden naif döngü (tick/s)
+#   hedef       : tek çekirdekte ≥ TARGET alarm değerlendirmesi/s; en katı okumayla tick/s karşılaştırılır
+#                 (her tick coin'in bütün alarm kitabını değerlendirir)
+#   python bench/bench_alerts.py --alerts 100000 --coins 100 --ticks 200000
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--alerts", type=int, default=100_000)
+    ap.add_argument("--coins", type=int, default=100)
+    ap.add_argument("--ticks", type=int, default=200_000)
+    ap.add_argument("--vol", type=float, default=0.002, help="tick başına göreli oynaklık")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args()
+
+    rng = random.Random(args.seed)
+    coins = [f"coin{i}" for i in range(args.coins)]
+    start = {c: 10 ** rng.uniform(-2, 4) for c in coins}
+    rows = [(f"user{n % 5000}", c, "price", rng.choice(("above", "below")), start[c] * rng.uniform(0.8, 1.2), 900, 0)
+            for n, c in ((n, coins[n % len(coins)]) for n in range(args.alerts))]
+
+    with tempfile.TemporaryDirectory(prefix="nexus-alerts-") as d:
+        path = os.path.join(d, "alerts.db")
+        db = sqlite3.connect(path)
+        db.executescript(SCHEMA)
+        db.executemany("INSERT OR IGNORE INTO alerts (owner, coin, metric, op, threshold, cooldown, created_at) VALUES (?, ?, ?, ?, ?, ?, ?)", rows)
+        db.commit()
+        db.close()
+
+        t = time.perf_counter()
+        engine = AlertEngine(path)
+        load = time.perf_counter() - t
+        total = sum(len(engine._books[(c, "price")]) for c in coins)
+
+        prices = dict(start)
+        steps = [(coins[k % len(coins)], rng.gauss(0, args.vol)) for k in range(args.ticks)]
+        for c in coins: engine.observe(c, "price", prices[c])  # ilk değer (taban)
+        fired = 0
+        t = time.perf_counter()
+        for c, r in steps:
+            prices[c] *= 1 + r
+            fired += len(engine.observe(c, "price", prices[c]))
+        took = time.perf_counter() - t
+        t = time.perf_counter()
+        engine.flush()
+        drain = time.perf_counter() - t
+        stored = engine._conn().execute("SELECT COUNT(*) FROM alert_events").fetchone()[0]
+
+        # Kesilen eşikler ölçümün dışında aynı tick'ler ayrı kitaplarda tekrar oynatılarak sayılır
+        books = {c: ThresholdBook() for c in coins}
+        for i, (_, c, _, op, th, _, _) in enumerate(rows): books[c].add(i, op, th)
+        last = dict(start)
+        for c in coins: books[c].crossed(last[c])
+        crossed = 0
+        for c, r in steps:
+            last[c] *= 1 + r
+            crossed += len(books[c].crossed(last[c]))
+
+        # Karşılaştırma: her tick'te coin'in bütün alarmlarını tarayan döngü
+        by_coin = {}
+        for _, c, _, op, th, _, _ in rows: by_coin.setdefault(c, []).append((op, th))
+        sample = steps[:max(1, args.ticks // 100)]
+        last = dict(start)
+        t = time.perf_counter()
+        for c, r in sample:
+            prev, now = last[c], last[c] * (1 + r)
+            last[c] = now
+            sum(1 for op, th in by_coin[c] if (prev < th <= now if op == "above" else now <= th < prev))
+        scan = (time.perf_counter() - t) / len(sample)
+
+    print(f"{total} alarm / {len(coins)} coin (coin başına ~{total / len(coins):.0f}), {args.ticks} tick, indeks yükleme {load:.2f}s")
+    rate = args.ticks / took
+    print(f"indeks : {rate:,.0f} tick/s  ({took:.2f}s, {crossed} eşik kesildi, {fired} tetiklenme, {crossed - fired} bekleme süresinde)")
+    print(f"yazım  : {stored} tetiklenme depoda, tick'lerden sonra {drain * 1000:.0f} ms")
+    print(f"tarama : {1 / scan:,.0f} tick/s")
+    print(f"hedef  : ≥{TARGET:,} /s, ölçülen {rate:,.0f} tick/s ({crossed / took:,.0f} kesilen eşik/s) -> {'GEÇTİ' if rate >= TARGET else 'KALDI'}")
+
+
+if __name__ == "__main__":
+    main()
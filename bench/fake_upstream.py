@@ -0,0 +1,174 @@
+import argparse
+import json
+import os
+import random
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# --- SAHTE COINGECKO / HABER SUNUCUSU ---
+# bench/fixtures altındaki kayıtları tekrar oynatır. Gecikme (latency + jitter) ve
+# rastgele 429 enjeksiyonu ayarlanabilir; her istek yol bazında sayılır.
+#   python bench/fake_upstream.py --port 8765 --latency 0.2 --p429 0.05
+# Uygulama NEXUS_COINGECKO_URL=http://127.0.0.1:8765/api/v3 ile buraya yönlendirilir.
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+DAY = 86_400_000
+
+
+def _load(name):
+    with open(os.path.join(FIXTURES, name), "rb") as f: return f.read()
+
+
+class Upstream:
+    def __init__(self, latency=0.0, jitter=0.0, p429=0.0, seed=0):
+        self.latency, self.jitter, self.p429 = latency, jitter, p429
+        self.rnd = random.Random(seed)
+        self.lock = threading.Lock()
+        self.calls = {}
+        self.markets = json.loads(_load("markets.json"))
+        self.coins_list = json.loads(_load("coins_list.json"))
+        self.global_data = json.loads(_load("global.json"))
+        self.rates = json.loads(_load("exchange_rates.json"))
+        self.news = _load("news.xml")
+        self.news_etag = '"%x"' % zlib.crc32(self.news)
+        self.charts = {}
+        chart_dir = os.path.join(FIXTURES, "market_chart")
+        for fn in os.listdir(chart_dir):
+            self.charts[fn[:-5]] = json.loads(_load(os.path.join("market_chart", fn)))
+
+    def count(self, path):
+        key = re.sub(r"/coins/[^/]+/", "/coins/{id}/", path)
+        with self.lock: self.calls[key] = self.calls.get(key, 0) + 1
+
+    def total_calls(self):
+        with self.lock: return sum(self.calls.values())
+
+    def reset(self):
+        with self.lock: self.calls.clear()
+
+    # Kayıtlı seri "şimdi"de bitecek şekilde kaydırılır; days/granülerlik CoinGecko gibi seçilir
+    def series(self, coin, start_ms, end_ms, days_span):
+        rec = self.charts.get(coin)
+        if rec is None: return None
+        step, prices = rec["step_ms"], rec["prices"]
+        now = int(time.time() * 1000)
+        first = now - (len(prices) - 1) * step
+        out_step = 300_000 if days_span <= 1 else step if days_span <= 90 else DAY
+        out = []
+        t = max(start_ms, first)
+        t -= (t - first) % out_step
+        while t <= min(end_ms, now):
+            i = (t - first) / step
+            lo = int(i); hi = min(lo + 1, len(prices) - 1)
+            out.append([t, prices[lo] + (prices[hi] - prices[lo]) * (i - lo)])
+            t += out_step
+        return out
+
+    def handle(self, path, q):
+        now = int(time.time() * 1000)
+        p = path.replace("/api/v3", "", 1)
+        by_id = {c["id"]: c for c in self.markets}
+        if p == "/news.xml": return 200, self.news, "application/rss+xml"
+        if p == "/simple/price":
+            cur = q.get("vs_currencies", "usd")
+            body = {}
+            for cid in q.get("ids", "").split(","):
+                c = by_id.get(cid)
+                if c: body[cid] = {cur: c["current_price"], f"{cur}_24h_change": c["price_change_percentage_24h_in_currency"], f"{cur}_24h_vol": c["market_cap"] / 20}
+            return 200, body
+        if p == "/search":
+            ql = q.get("query", "").lower()
+            return 200, {"coins": [{"id": c["id"]} for c in self.coins_list if ql in (c["id"], c["symbol"]) or c["name"].lower().startswith(ql)]}
+        if p == "/global": return 200, self.global_data
+        if p == "/exchange_rates": return 200, self.rates
+        if p == "/coins/list": return 200, self.coins_list
+        if p == "/coins/markets":
+            per_page, page = int(q.get("per_page", 100)), int(q.get("page", 1))
+            rows = self.markets[(page - 1) * per_page: page * per_page]
+            if q.get("sparkline") != "true": rows = [{k: v for k, v in c.items() if k != "sparkline_in_7d"} for c in rows]
+            return 200, rows
+        m = re.fullmatch(r"/coins/([^/]+)/(market_chart/range|market_chart|ohlc)", p)
+        if m:
+            coin, kind = m.groups()
+            if kind == "market_chart/range":
+                start, end = int(float(q["from"]) * 1000), int(float(q["to"]) * 1000)
+                data = self.series(coin, start, end, (end - start) / DAY)
+            else:
+                days = float(q.get("days", 1))
+                data = self.series(coin, now - int(days * DAY), now, days)
+            if data is None: return 404, {"error": "coin not found"}
+            if kind != "ohlc": return 200, {"prices": data}
+            days = float(q.get("days", 1))
+            width = 1_800_000 if days <= 2 else 14_400_000 if days <= 30 else 4 * DAY
+            candles = {}
+            for t, v in data:
+                b = t - t % width + width
+                o = candles.setdefault(b, [b, v, v, v, v])
+                o[2], o[3], o[4] = max(o[2], v), min(o[3], v), v
+            return 200, list(candles.values())
+        return 404, {"error": "unknown path"}
+
+
+def make_handler(up):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+
+        def do_GET(self):
+            u = urlparse(self.path)
+            q = {k: v[0] for k, v in parse_qs(u.query).items()}
+            if u.path == "/_bench/calls":
+                body = json.dumps({"total": up.total_calls(), "by_path": up.calls}).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                return
+            up.count(u.path)
+            delay = up.latency + up.rnd.uniform(0, up.jitter)
+            if delay: time.sleep(delay)
+            if up.p429 and up.rnd.random() < up.p429:
+                code, body, ctype = 429, b'{"status":{"error_code":429}}', "application/json"
+                extra = {"Retry-After": "1"}
+            elif u.path.endswith("/news.xml") and self.headers.get("If-None-Match") == up.news_etag:
+                code, body, ctype, extra = 304, b"", "application/rss+xml", {"ETag": up.news_etag}
+            else:
+                res = up.handle(u.path, q)
+                code, body = res[0], res[1]
+                ctype = res[2] if len(res) > 2 else "application/json"
+                if not isinstance(body, bytes): body = json.dumps(body).encode()
+                extra = {"ETag": up.news_etag} if u.path.endswith("/news.xml") else {}
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in extra.items(): self.send_header(k, v)
+            self.end_headers()
+            self.wfile.write(body)
+    return Handler
+
+
+def start(port=0, **opts):
+    up = Upstream(**opts)
+    server = ThreadingHTTPServer(("127.0.0.1", port), make_handler(up))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="fake-upstream", daemon=True).start()
+    return up, server
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--jitter", type=float, default=0.05)
+    ap.add_argument("--p429", type=float, default=0.0)
+    args = ap.parse_args()
+    up, server = start(args.port, latency=args.latency, jitter=args.jitter, p429=args.p429)
+    print(f"fake upstream: http://127.0.0.1:{server.server_address[1]}/api/v3")
+    try:
+        while True: time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
@@ -0,0 +1,85 @@
+import argparse
+import json
+import math
+import os
+import random
+import time
+
+import requests
+
+# --- FIXTURE KAYDI ---
+# Benchmark'ın sahte upstream'i (fake_upstream.py) bu dosyaları tekrar oynatır.
+#   python bench/record_fixtures.py            -> gerçek CoinGecko'dan kaydeder
+#   python bench/record_fixtures.py --synthetic -> ağ olmadan deterministik veri üretir
+# Seriler {"step_ms", "prices"} olarak saklanır; sunucu zaman damgalarını "şimdi"ye kaydırır.
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FIXTURES = os.path.join(HERE, "fixtures")
+API = "https://api.coingecko.com/api/v3"
+CHART_COINS = ["bitcoin", "ethereum", "solana"]
+HOUR = 3_600_000
+
+
+def _dump(name, data):
+    path = os.path.join(FIXTURES, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f: json.dump(data, f, separators=(",", ":"))
+
+
+def _series(prices):
+    return {"step_ms": HOUR, "prices": [round(p, 6 if p < 1 else 2) for p in prices]}
+
+
+def record():
+    s = requests.Session()
+    get = lambda path, **params: s.get(f"{API}/{path}", params=params, timeout=30).json()
+    markets = get("coins/markets", vs_currency="usd", order="market_cap_desc", per_page=50, page=1, sparkline="true", price_change_percentage="1h,24h,7d")
+    _dump("markets.json", markets)
+    _dump("coins_list.json", [{"id": c["id"], "symbol": c["symbol"], "name": c["name"]} for c in markets])
+    _dump("global.json", get("global"))
+    _dump("exchange_rates.json", get("exchange_rates"))
+    for coin in CHART_COINS:
+        time.sleep(2.5)
+        data = get(f"coins/{coin}/market_chart", vs_currency="usd", days=90)
+        _dump(f"market_chart/{coin}.json", _series([p for _, p in data["prices"]]))
+
+
+def synthetic():
+    rnd = random.Random(42)
+    base = [("bitcoin", "btc", "Bitcoin", 64000), ("ethereum", "eth", "Ethereum", 3200), ("tether", "usdt", "Tether", 1.0),
+            ("binancecoin", "bnb", "BNB", 580), ("solana", "sol", "Solana", 150), ("ripple", "xrp", "XRP", 0.55),
+            ("usd-coin", "usdc", "USDC", 1.0), ("cardano", "ada", "Cardano", 0.45), ("dogecoin", "doge", "Dogecoin", 0.14),
+            ("tron", "trx", "TRON", 0.12), ("avalanche-2", "avax", "Avalanche", 32), ("polkadot", "dot", "Polkadot", 6.5)]
+    for n in range(len(base), 50):
+        base.append((f"token-{n}", f"tk{n}", f"Token {n}", round(rnd.uniform(0.01, 50), 4)))
+    supply = 1e9
+    markets = []
+    for rank, (cid, sym, name, price) in enumerate(base, 1):
+        walk = [price]
+        for _ in range(24 * 7 - 1): walk.append(walk[-1] * math.exp(rnd.gauss(0, 0.006)))
+        markets.append({
+            "id": cid, "symbol": sym, "name": name, "image": "", "current_price": walk[-1],
+            "market_cap": walk[-1] * supply / rank, "market_cap_rank": rank,
+            "price_change_percentage_1h_in_currency": rnd.uniform(-1, 1),
+            "price_change_percentage_24h_in_currency": rnd.uniform(-5, 5),
+            "price_change_percentage_7d_in_currency": (walk[-1] / walk[0] - 1) * 100,
+            "sparkline_in_7d": {"price": [round(p, 6) for p in walk]},
+        })
+    _dump("markets.json", markets)
+    _dump("coins_list.json", [{"id": c["id"], "symbol": c["symbol"], "name": c["name"]} for c in markets])
+    cap = sum(c["market_cap"] for c in markets)
+    _dump("global.json", {"data": {"total_market_cap": {"usd": cap, "try": cap * 34, "eur": cap * 0.92}, "market_cap_change_percentage_24h_usd": 1.4}})
+    _dump("exchange_rates.json", {"rates": {"btc": {"value": 1}, "usd": {"value": 64000}, "try": {"value": 2176000}, "eur": {"value": 58900}}})
+    for cid, _, _, price in base[:12]:
+        if cid not in CHART_COINS: continue
+        walk = [price]
+        for _ in range(24 * 90 - 1): walk.append(walk[-1] * math.exp(rnd.gauss(0, 0.005)))
+        scale = price / walk[-1]
+        _dump(f"market_chart/{cid}.json", _series([p * scale for p in walk]))
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--synthetic", action="store_true")
+    args = ap.parse_args()
+    synthetic() if args.synthetic else record()
@@ -0,0 +1,179 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import types
+
+import requests
+
+# --- RERUN GECİKME BENCHMARK'I ---
+# app.py'yi Streamlit AppTest ile başsız çalıştırır. Tüm fetcher'lar fake_upstream'e
+# yönlenir, Gemini yerine sahte bir model kullanılır. Her mod için:
+#   soğuk rerun  : her ölçüm taze bir süreçte ve boş NEXUS_DATA_DIR ile (p50/p95)
+#   sıcak rerun  : aynı oturumda tekrar eden rerun'lar (p50/p95)
+#   upstream     : soğuk ve sıcak aşamada fake sunucuya giden istek sayısı
+#   bellek       : tracemalloc ile tepe Python bellek kullanımı; zamanlamayı bozmaması için
+#                  ayrı bir süreçte (aynı soğuk + sıcak senaryo) ölçülür, süreleri raporlanmaz
+#   --shared-cache: bir moddaki tüm soğuk süreçler aynı SQLite ortak cache'i paylaşır
+#                   (replika filosu taklidi; ilkinden sonrakiler upstream'e neredeyse hiç gitmez)
+#   python bench/run_bench.py --cold 5 --warm 20 --latency 0.2 --p429 0.02
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(os.path.dirname(HERE), "app.py")
+MODES = ["TERMINAL", "PRO TERMINAL", "SCREENER", "PORTAL"]
+
+
+def percentile(values, q):
+    if not values: return float("nan")
+    v = sorted(values)
+    k = (len(v) - 1) * q
+    lo = int(k)
+    hi = min(lo + 1, len(v) - 1)
+    return v[lo] + (v[hi] - v[lo]) * (k - lo)
+
+
+# --- SAHTE GEMINI ---
+def install_fake_gemini(latency):
+    class _Chunk:
+        def __init__(self, text): self.text = text
+
+    class GenerativeModel:
+        def __init__(self, *args, **kwargs): pass
+
+        def generate_content(self, prompt, stream=False):
+            words = ("NEXUS bench cevabı: trend nötr, destek ve direnç seviyeleri korunuyor. " * 4).split()
+            if not stream:
+                time.sleep(latency)
+                return _Chunk(" ".join(words))
+            def gen():
+                for w in words:
+                    time.sleep(latency / len(words))
+                    yield _Chunk(w + " ")
+            return gen()
+
+    genai = types.ModuleType("google.generativeai")
+    genai.configure = lambda **kwargs: None
+    genai.GenerativeModel = GenerativeModel
+    if "google" not in sys.modules:
+        try: import google  # noqa: F401
+        except ImportError: sys.modules["google"] = types.ModuleType("google")
+    sys.modules["google.generativeai"] = genai
+    sys.modules["google"].generativeai = genai
+
+
+def upstream_calls(url):
+    return requests.get(url.replace("/api/v3", "") + "/_bench/calls", timeout=5).json()["total"]
+
+
+# --- TEK SÜREÇLİK ÖLÇÜM (alt süreç) ---
+def worker(mode, url, warm, ai, llm_latency, memory=False):
+    from streamlit.testing.v1 import AppTest
+    install_fake_gemini(llm_latency)
+    at = AppTest.from_file(APP, default_timeout=120)
+    at.secrets["GEMINI_API_KEY"] = "bench"
+    at.session_state["app_mode"] = mode
+
+    if memory: tracemalloc.start()
+    before = upstream_calls(url)
+    t = time.perf_counter()
+    at.run()
+    cold = time.perf_counter() - t
+    cold_calls = upstream_calls(url) - before
+
+    warm_times, errors = [], len(at.exception)
+    before = upstream_calls(url)
+    for _ in range(warm):
+        if ai:
+            btn = next((b for b in at.button if b.label == "ANALİZİ BAŞLAT"), None)
+            if btn: btn.click()
+        t = time.perf_counter()
+        at.run()
+        warm_times.append(time.perf_counter() - t)
+        errors += len(at.exception)
+    warm_calls = upstream_calls(url) - before
+    peak = tracemalloc.get_traced_memory()[1] / 2**20 if memory else None
+    return {"cold": cold, "warm": warm_times, "cold_calls": cold_calls, "warm_calls": warm_calls,
+            "peak_mb": peak, "errors": errors,
+            "error_msgs": sorted({e.message for e in at.exception})}
+
+
+def run_worker(mode, url, args, data_dir, shared="", memory=False):
+    env = dict(os.environ, NEXUS_COINGECKO_URL=url, NEXUS_DATA_DIR=data_dir, NEXUS_SHARED_CACHE=shared,
+               NEXUS_NEWS_FEEDS=url.rsplit("/api/v3", 1)[0] + "/news.xml",
+               NEXUS_LIVE_FEED="replay:" + os.path.join(HERE, "fixtures", "market_chart"))
+    cmd = [sys.executable, __file__, "--worker", mode, "--url", url, "--warm", str(args.warm), "--llm-latency", str(args.llm_latency)]
+    if args.ai: cmd.append("--ai")
+    if memory: cmd.append("--memory")
+    out = subprocess.run(cmd, env=env, capture_output=True, text=True, timeout=900)
+    line = next((l for l in reversed(out.stdout.splitlines()) if l.startswith("{")), None)
+    if line is None: raise RuntimeError(f"worker failed ({mode}):\n{out.stderr[-2000:]}")
+    return json.loads(line)
+
+
+def main():
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--modes", nargs="+", default=MODES)
+    ap.add_argument("--cold", type=int, default=5, help="soğuk ölçüm sayısı (her biri yeni süreç)")
+    ap.add_argument("--warm", type=int, default=20, help="süreç başına sıcak rerun sayısı")
+    ap.add_argument("--latency", type=float, default=0.2)
+    ap.add_argument("--jitter", type=float, default=0.05)
+    ap.add_argument("--p429", type=float, default=0.0)
+    ap.add_argument("--llm-latency", type=float, default=1.0)
+    ap.add_argument("--ai", action="store_true", help="sıcak rerun'larda ANALİZİ BAŞLAT'a bas")
+    ap.add_argument("--shared-cache", action="store_true", help="soğuk süreçler ortak SQLite cache kullansın")
+    ap.add_argument("--json", help="sonuçları bu dosyaya yaz")
+    ap.add_argument("--worker")
+    ap.add_argument("--url")
+    ap.add_argument("--memory", action="store_true")
+    args = ap.parse_args()
+
+    if args.worker:
+        print(json.dumps(worker(args.worker, args.url, args.warm, args.ai, args.llm_latency, args.memory)))
+        return
+
+    sys.path.insert(0, HERE)
+    import fake_upstream
+    _, server = fake_upstream.start(0, latency=args.latency, jitter=args.jitter, p429=args.p429)
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/v3"
+
+    report = {}
+    for mode in args.modes:
+        runs = []
+        with tempfile.TemporaryDirectory(prefix="nexus-shared-") as shared_dir:
+            shared = f"sqlite:///{shared_dir}/shared.db" if args.shared_cache else ""
+            for _ in range(args.cold):
+                with tempfile.TemporaryDirectory(prefix="nexus-bench-") as data_dir:
+                    runs.append(run_worker(mode, url, args, data_dir, shared))
+        # Bellek ölçümü ayrı süreçte; bu geçişin süreleri ve upstream çağrıları raporlanmaz
+        with tempfile.TemporaryDirectory(prefix="nexus-bench-") as data_dir:
+            mem = run_worker(mode, url, args, data_dir, memory=True)
+        cold = [r["cold"] for r in runs]
+        warm = [t for r in runs for t in r["warm"]]
+        report[mode] = {
+            "cold_p50": percentile(cold, 0.5), "cold_p95": percentile(cold, 0.95),
+            "warm_p50": percentile(warm, 0.5), "warm_p95": percentile(warm, 0.95),
+            "cold_calls": max(r["cold_calls"] for r in runs),
+            "cold_calls_total": sum(r["cold_calls"] for r in runs),
+            "warm_calls_per_rerun": sum(r["warm_calls"] for r in runs) / max(1, len(warm)),
+            "peak_mb": mem["peak_mb"],
+            "errors": sum(r["errors"] for r in runs),
+            "error_msgs": sorted({m for r in runs for m in r["error_msgs"]}),
+        }
+    server.shutdown()
+
+    print(f"latency={args.latency}s jitter={args.jitter}s p429={args.p429} cold={args.cold} warm={args.warm}")
+    print(f"{'mode':<14}{'cold p50':>10}{'cold p95':>10}{'warm p50':>10}{'warm p95':>10}{'calls':>7}{'Σcalls':>7}{'calls/rr':>9}{'peak MB':>9}{'err':>5}")
+    for mode, r in report.items():
+        print(f"{mode:<14}{r['cold_p50']:>9.3f}s{r['cold_p95']:>9.3f}s{r['warm_p50']:>9.3f}s{r['warm_p95']:>9.3f}s"
+              f"{r['cold_calls']:>7}{r['cold_calls_total']:>7}{r['warm_calls_per_rerun']:>9.2f}{r['peak_mb']:>9.1f}{r['errors']:>5}")
+        for m in r["error_msgs"]: print(f"    ! {m}")
+    if args.json:
+        with open(args.json, "w") as f: json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+import functools
+import threading
+import time
+from collections import OrderedDict
+
+from data_engine import SINGLEFLIGHT, RATE_LIMIT, RateLimited
+from metrics import METRICS, log
+from shared_cache import SHARED
+
+# --- STALE-WHILE-REVALIDATE CACHE ---
+# Süresi dolan bir anahtar için kullanıcı beklemez: son iyi değer hemen döner,
+# yenileme arka planda yapılır. Yenileme sırası anahtarın ne kadar okunduğuna göre
+# belirlenir; 429/timeout durumunda eski değer korunur, panel asla boşalmaz.
+# NEXUS_SHARED_CACHE ayarlıysa yüklemeler replikalar arası ortak katmandan geçer (bkz. shared_cache).
+
+_MISSING = object()
+
+
+class _Entry:
+    __slots__ = ("value", "fetched_at", "stamp", "ttl", "loader", "reads", "fails", "retry_at")
+
+    def __init__(self, loader, ttl):
+        self.value = _MISSING
+        self.fetched_at = 0.0
+        self.stamp = 0.0  # değerin upstream'den çekildiği duvar saati (ortak katmanla karşılaştırma için)
+        self.ttl = ttl
+        self.loader = loader
+        self.reads = 0
+        self.fails = 0
+        self.retry_at = 0.0
+
+
+class SWRCache:
+    MAX_ENTRIES = 2048
+    WORKERS = 2
+    MAX_BACKOFF = 300
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._entries = OrderedDict()
+        self._pending = set()
+        self._workers = []
+
+    def get(self, key, loader, ttl, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(loader, ttl)
+                self._evict()
+            else:
+                self._entries.move_to_end(key)
+            entry.loader, entry.ttl = loader, ttl
+            entry.reads += 1
+            value = entry.value
+            if value is not _MISSING:
+                stale = now - entry.fetched_at >= ttl
+                METRICS.inc("nexus_cache_requests_total", fn=key[0], result="stale" if stale else "hit")
+                if stale and now >= entry.retry_at: self._schedule(key)
+                return value
+            METRICS.inc("nexus_cache_requests_total", fn=key[0], result="miss")
+            if now < entry.retry_at: return default  # yakın zamanda başarısız oldu, upstream'i dövme
+        # İlk okuma: beklemek zorunda, ama aynı anahtar için tek istek uçar.
+        try:
+            return SINGLEFLIGHT.do(("swr",) + key, lambda: self._load(key, entry))
+        except Exception:
+            return default
+
+    # Okuma sayacına dokunmadan anahtarı hemen yeniler (arka plan poller'ı için)
+    def refresh(self, key, loader, ttl):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                entry = self._entries[key] = _Entry(loader, ttl)
+                self._evict()
+            entry.loader, entry.ttl = loader, ttl
+        return SINGLEFLIGHT.do(("swr",) + key, lambda: self._load(key, entry))
+
+    def peek(self, key, default=None):
+        with self._lock:
+            entry = self._entries.get(key)
+            return default if entry is None or entry.value is _MISSING else entry.value
+
+    def _load(self, key, entry):
+        try:
+            # Başka bir replika daha yeni bir değer yazdıysa upstream'e gidilmez
+            stamp, value = SHARED.load(key, entry.loader, entry.ttl, newer_than=entry.stamp)
+        except RateLimited:
+            METRICS.inc("nexus_cache_load_failures_total", fn=key[0], reason="rate_limited")
+            self._failed(entry, RATE_LIMIT.wait_time())
+            raise
+        except Exception as e:
+            METRICS.inc("nexus_cache_load_failures_total", fn=key[0], reason=type(e).__name__)
+            log.warning("cache load failed: %s", key, exc_info=True)
+            self._failed(entry)
+            raise
+        with self._lock:
+            entry.value = value
+            entry.stamp = stamp
+            entry.fetched_at = time.monotonic() - max(0.0, time.time() - stamp)
+            entry.fails = 0
+            entry.retry_at = 0.0
+        return value
+
+    def _failed(self, entry, delay=0.0):
+        with self._lock:
+            entry.fails += 1
+            backoff = min(self.MAX_BACKOFF, 5 * 2 ** (entry.fails - 1))
+            entry.retry_at = time.monotonic() + max(delay, backoff)
+
+    def _evict(self):
+        while len(self._entries) > self.MAX_ENTRIES:
+            key, _ = self._entries.popitem(last=False)
+            self._pending.discard(key)
+
+    # --- ARKA PLAN YENİLEME ---
+    def _schedule(self, key):
+        if key in self._pending: return
+        self._pending.add(key)
+        if len(self._workers) < self.WORKERS:
+            t = threading.Thread(target=self._worker, name=f"nexus-swr-{len(self._workers)}", daemon=True)
+            self._workers.append(t)
+            t.start()
+        self._wakeup.notify()
+
+    def _worker(self):
+        while True:
+            with self._lock:
+                while not self._pending: self._wakeup.wait()
+                # En çok okunan anahtar önce yenilenir
+                key = max(self._pending, key=lambda k: self._entries[k].reads if k in self._entries else -1)
+                self._pending.discard(key)
+                entry = self._entries.get(key)
+                if entry is None: continue
+                entry.reads = 0
+            try: SINGLEFLIGHT.do(("swr",) + key, lambda: self._load(key, entry))
+            except Exception: pass
+
+
+CACHE = SWRCache()
+
+
+# `@st.cache_data(ttl=...)` yerine kullanılır. default çağrılabilir ise (ör. pd.DataFrame)
+# her boş dönüşte yeni bir nesne üretilir.
+def swr_cached(ttl, default=None):
+    def deco(fn):
+        @functools.wraps(fn)
+        def wrapper(*args):
+            fallback = default() if callable(default) else default
+            return CACHE.get((fn.__name__,) + args, lambda: fn(*args), ttl, fallback)
+        # Beklemeden sadece cache'te olanı döndürür (yoksa None)
+        wrapper.peek = lambda *args: CACHE.peek((fn.__name__,) + args)
+        wrapper.refresh = lambda *args: CACHE.refresh((fn.__name__,) + args, lambda: fn(*args), ttl)
+        return wrapper
+    return deco
@@ -0,0 +1,73 @@
+import difflib
+from array import array
+from bisect import bisect_left
+
+# --- YEREL COIN ARAMA İNDEKSİ ---
+# /coins/list'in tamamı (id, symbol, name) bir kez yüklenir ve sıralı anahtar
+# dizileri + sözlüklerle tutulur. "sol", "Solana" ya da "solana" ağa gitmeden,
+# mikro saniyeler içinde çözülür. Aynı sembolü taşıyan coin'ler piyasa değeri
+# sırasına göre ayrılır (ör. "sol" -> solana).
+
+UNRANKED = 1 << 30
+PREFIX_SCAN = 500   # önek eşleşmesinde bakılan en fazla aday
+FUZZY_CUTOFF = 0.8
+
+
+class CoinIndex:
+    def __init__(self, coins, ranks=None):
+        ranks = ranks or {}
+        self.ids = [c['id'] for c in coins]
+        self.symbols = [(c.get('symbol') or '').lower() for c in coins]
+        self.names = [(c.get('name') or '').lower() for c in coins]
+        self.rank = array('i', (ranks.get(i) or UNRANKED for i in self.ids))
+
+        self.by_id = {cid: n for n, cid in enumerate(self.ids)}
+        self.by_symbol = self._group(self.symbols)
+        self.by_name = self._group(self.names)
+
+        pairs = sorted({(k, n) for n in range(len(self.ids)) for k in (self.ids[n], self.symbols[n], self.names[n]) if k})
+        self.keys = [k for k, _ in pairs]
+        self.key_idx = array('i', (n for _, n in pairs))
+        # Bulanık eşleşme sadece sıralaması bilinen coin'lerde yapılır (hem hızlı hem anlamlı)
+        ranked = [n for n in range(len(self.ids)) if self.rank[n] != UNRANKED]
+        self.fuzzy = {}
+        for n in ranked:
+            for k in (self.ids[n], self.symbols[n], self.names[n]):
+                if k and self.rank[self.fuzzy.get(k, n)] >= self.rank[n]: self.fuzzy[k] = n
+
+    def _group(self, keys):
+        groups = {}
+        for n, k in enumerate(keys):
+            if k: groups.setdefault(k, []).append(n)
+        return {k: tuple(sorted(v, key=self.rank.__getitem__)) for k, v in groups.items()}
+
+    def __len__(self):
+        return len(self.ids)
+
+    def resolve(self, query):
+        hits = self.search(query, limit=1)
+        return hits[0] if hits else None
+
+    # Sıra: tam id > tam sembol > tam isim > önek > bulanık; her grup içinde piyasa değeri
+    def search(self, query, limit=10):
+        q = (query or '').lower().strip()
+        if not q: return []
+        out = []
+        def add(ns):
+            for n in ns:
+                cid = self.ids[n]
+                if cid not in out: out.append(cid)
+        if q in self.by_id: add([self.by_id[q]])
+        add(self.by_symbol.get(q, ()))
+        add(self.by_name.get(q, ()))
+        if len(out) < limit:
+            start = bisect_left(self.keys, q)
+            cand = set()
+            for i in range(start, min(start + PREFIX_SCAN, len(self.keys))):
+                if not self.keys[i].startswith(q): break
+                cand.add(self.key_idx[i])
+            add(sorted(cand, key=lambda n: (self.rank[n], len(self.ids[n]))))
+        if not out:
+            for k in difflib.get_close_matches(q, list(self.fuzzy), n=limit, cutoff=FUZZY_CUTOFF):
+                add([self.fuzzy[k]])
+        return out[:limit]
@@ -0,0 +1,55 @@
+import os
+import time
+
+from ts_store import DATA_DIR, LocalDB
+
+# --- TOPLULUK AKIŞI ---
+# Gönderiler oturumda değil, tüm kullanıcıların paylaştığı bir depoda tutulur. SQLite (WAL)
+# yerel karşılıktır: yazma sadece ekleme, okuma id üzerinden imleçli sayfalama
+# (id < cursor ORDER BY id DESC LIMIT n). Oturum en fazla bir sayfa + bir imleç tutar.
+
+DB_PATH = os.environ.get("NEXUS_DB_PATH", os.path.join(DATA_DIR, "community.db"))
+PAGE_SIZE = 20
+MAX_MSG = 500
+MAX_USER = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS posts (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    user TEXT NOT NULL,
+    msg TEXT NOT NULL,
+    created_at INTEGER NOT NULL
+)
+"""
+WELCOME = ("Admin 🦁", "NEXUS v20.1: Ekran genişletildi, logo düzeltildi.")
+
+
+class FeedStore:
+    def __init__(self, path=DB_PATH):
+        self.path = path
+        self._conn = LocalDB(path)
+        with self._conn() as db:
+            db.execute(SCHEMA)
+            if db.execute("SELECT 1 FROM posts LIMIT 1").fetchone() is None:
+                db.execute("INSERT INTO posts (user, msg, created_at) VALUES (?, ?, ?)", (*WELCOME, int(time.time())))
+
+    def post(self, user, msg):
+        msg = (msg or "").strip()[:MAX_MSG]
+        if not msg: return None
+        user = (user or "Misafir").strip()[:MAX_USER]
+        with self._conn() as db:
+            cur = db.execute("INSERT INTO posts (user, msg, created_at) VALUES (?, ?, ?)", (user, msg, int(time.time())))
+        return cur.lastrowid
+
+    # cursor=None en yeni sayfa; dönen next_cursor daha eski sayfa için (yoksa None)
+    def page(self, cursor=None, limit=PAGE_SIZE):
+        q = "SELECT id, user, msg, created_at FROM posts"
+        args = ()
+        if cursor is not None:
+            q += " WHERE id < ?"
+            args = (cursor,)
+        rows = self._conn().execute(q + " ORDER BY id DESC LIMIT ?", args + (limit + 1,)).fetchall()
+        more = len(rows) > limit
+        rows = rows[:limit]
+        posts = [{"id": i, "user": u, "msg": m, "time": time.strftime("%H:%M", time.localtime(t))} for i, u, m, t in rows]
+        return posts, (rows[-1][0] if more else None)
@@ -0,0 +1,247 @@
+import os
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import METRICS, log
+
+# --- ORTAK VERİ KATMANI ---
+# Tüm CoinGecko çağrıları tek bir keep-alive Session üzerinden gider;
+# böylece her istek ayrı TCP+TLS el sıkışması ödemez.
+
+COINGECKO_URL = os.environ.get("NEXUS_COINGECKO_URL", "https://api.coingecko.com/api/v3").rstrip("/")
+HEADERS = {"User-Agent": "Mozilla/5.0", "Accept": "application/json"}
+TIMEOUT = 5
+POOL_SIZE = 16
+
+
+def _build_session():
+    s = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update(HEADERS)
+    return s
+
+
+SESSION = _build_session()
+# Bir rerun'ın ihtiyaç duyduğu istekleri paralel açmak için ortak havuz
+EXECUTOR = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="nexus-fetch")
+
+
+# --- HIZ LİMİTİ (TOKEN BUCKET) ---
+# CoinGecko ücretsiz/demo planı dakikada ~30 çağrıya izin verir. Her istek bir jeton
+# harcar; 429 gelirse Retry-After süresince kova kilitlenir.
+class RateLimited(Exception):
+    pass
+
+
+class TokenBucket:
+    def __init__(self, per_minute, burst):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self):
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            if now < self.blocked_until: return self.blocked_until - now
+            return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def acquire(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+                if now >= self.blocked_until and self.tokens >= 1:
+                    self.tokens -= 1
+                    return True
+                wait = max(self.blocked_until - now, (1 - self.tokens) / self.rate)
+            if now + wait > deadline: return False
+            time.sleep(wait)
+
+    def penalize(self, seconds):
+        with self._lock:
+            self.tokens = 0.0
+            self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+RATE_LIMIT = TokenBucket(float(os.environ.get("NEXUS_CG_RATE_PER_MIN", 30)), burst=10)
+RATE_WAIT = 3  # ön plandaki bir istek jeton için en fazla bu kadar bekler
+
+
+def _endpoint(path):
+    return re.sub(r"^coins/[^/]+/", "coins/{id}/", path.lstrip("/"))
+
+
+def api_get(path, params=None, timeout=TIMEOUT):
+    endpoint = _endpoint(path)
+    if not RATE_LIMIT.acquire(RATE_WAIT):
+        METRICS.inc("nexus_upstream_requests_total", endpoint=endpoint, status="throttled")
+        raise RateLimited(path)
+    t = time.perf_counter()
+    try:
+        r = SESSION.get(f"{COINGECKO_URL}/{path.lstrip('/')}", params=params, timeout=timeout)
+    except requests.Timeout:
+        METRICS.inc("nexus_upstream_requests_total", endpoint=endpoint, status="timeout")
+        raise
+    except requests.RequestException:
+        METRICS.inc("nexus_upstream_requests_total", endpoint=endpoint, status="error")
+        raise
+    finally:
+        METRICS.observe("nexus_upstream_seconds", time.perf_counter() - t, endpoint=endpoint)
+    METRICS.inc("nexus_upstream_requests_total", endpoint=endpoint, status=str(r.status_code))
+    if r.status_code == 429:
+        try: retry_after = float(r.headers.get("Retry-After", 60))
+        except ValueError: retry_after = 60.0
+        RATE_LIMIT.penalize(retry_after)
+        raise RateLimited(path)
+    return r
+
+
+# --- PARALEL TOPLAMA (FAN-OUT) ---
+# calls: [(fonksiyon, argümanlar), ...] -> sonuçlar aynı sırada döner.
+def fan_out(calls):
+    futures = [EXECUTOR.submit(fn, *args) for fn, args in calls]
+    results = []
+    for fut in futures:
+        try: results.append(fut.result())
+        except Exception:
+            log.warning("fan_out job failed", exc_info=True)
+            results.append(None)
+    return results
+
+
+# --- SINGLEFLIGHT ---
+# Aynı anahtar için eşzamanlı gelen çağrılar tek bir uçuştaki isteği paylaşır.
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        if not leader:
+            call.event.wait()
+            if call.error is not None: raise call.error
+            return call.result
+        try:
+            call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock: self._calls.pop(key, None)
+            call.event.set()
+        return call.result
+
+
+# --- SIMPLE/PRICE MİKRO-BATCHER ---
+# Kısa bir pencere içinde istenen id'ler tek bir `ids=a,b,c` çağrısında birleşir,
+# sonuç id bazında geri dağıtılır. Sık kullanılan id'ler (bitcoin, top-10) her
+# batch'e eklenir ve kısa süre hatırlanır; bu id'ler için ayrı çağrı gerekmez.
+class _Batch:
+    def __init__(self):
+        self.ids = set()
+        self.event = threading.Event()
+        self.data = None
+        self.error = None
+
+
+class PriceBatcher:
+    WINDOW = 0.02        # saniye; bir rerun'daki paralel çağrıları toplamaya yeter
+    MAX_IDS = 100
+    RECENT_TTL = 30
+    MAX_HOT = 50
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}   # currency -> _Batch
+        self._hot = []
+        self._recent = {}    # (id, currency) -> (zaman, veri)
+
+    def piggyback(self, ids):
+        with self._lock:
+            for i in ids:
+                if i in self._hot: self._hot.remove(i)
+                self._hot.insert(0, i)
+            del self._hot[self.MAX_HOT:]
+
+    def get(self, coin_id, currency):
+        return self.get_many([coin_id], currency).get(coin_id)
+
+    def get_many(self, ids, currency):
+        now = time.monotonic()
+        out, missing = {}, []
+        with self._lock:
+            for i in ids:
+                hit = self._recent.get((i, currency))
+                if hit and now - hit[0] < self.RECENT_TTL: out[i] = hit[1]
+                else: missing.append(i)
+            if not missing: return out
+            batch = self._pending.get(currency)
+            leader = batch is None or len(batch.ids) + len(missing) > self.MAX_IDS
+            if leader:
+                batch = self._pending[currency] = _Batch()
+            batch.ids.update(missing)
+        if leader:
+            time.sleep(self.WINDOW)
+            self._flush(currency, batch)
+        else:
+            batch.event.wait()
+        if batch.error is not None: raise batch.error
+        for i in missing:
+            if i in batch.data: out[i] = batch.data[i]
+        return out
+
+    def _flush(self, currency, batch):
+        with self._lock:
+            if self._pending.get(currency) is batch: del self._pending[currency]
+            extra = [i for i in self._hot if i not in batch.ids]
+            ids = sorted(batch.ids) + extra[:max(0, self.MAX_IDS - len(batch.ids))]
+        try:
+            params = {"ids": ",".join(ids), "vs_currencies": currency, "include_24hr_change": "true", "include_24hr_vol": "true"}
+            r = api_get("simple/price", params)
+            r.raise_for_status()
+            batch.data = r.json()
+            now = time.monotonic()
+            with self._lock:
+                for i, v in batch.data.items(): self._recent[(i, currency)] = (now, v)
+                for k in [k for k, (t, _) in self._recent.items() if now - t >= self.RECENT_TTL]: del self._recent[k]
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.event.set()
+
+
+SINGLEFLIGHT = SingleFlight()
+PRICE_BATCHER = PriceBatcher()
+
+
+def fetch_price(coin_id, currency):
+    return SINGLEFLIGHT.do(("simple/price", coin_id, currency), lambda: PRICE_BATCHER.get(coin_id, currency))
+
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+# --- GRAFİK VERİSİ KÜÇÜLTME ---
+# Tarayıcıya her ham nokta yerine grafik genişliğine göre bir nokta bütçesi gönderilir.
+# LTTB (Largest-Triangle-Three-Buckets) çizginin görsel şeklini (tepeler/dipler) korur.
+# Depodaki pencereler: 24s ≈ 288 (5dk) + canlı tick'ler, 7g ≈ 168 (1s), 30g ≈ 720 (1s), 6a ≈ 180 (1g).
+# 0.4 nokta/px ile 700 px'lik mini grafik 280 noktaya iner (30g: 720 -> 280, 24s+tick: ~600 -> 280).
+
+POINTS_PER_PX = 0.4
+
+
+def point_budget(width_px):
+    return max(64, int(width_px * POINTS_PER_PX))
+
+
+# x, y: eşit uzunlukta sayısal diziler -> seçilen indeksler (ilk ve son nokta her zaman kalır)
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n_out >= n or n_out < 3: return np.arange(n)
+    x = np.asarray(x, dtype="f8")
+    y = np.asarray(y, dtype="f8")
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Sonraki kovanın ortalaması üçgenin üçüncü köşesi
+        nlo, nhi = hi, edges[i + 2] if i + 2 < len(edges) else n
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+
+def downsample_line(df, n_out, x='time', y='price'):
+    if len(df) <= n_out: return df
+    xs = df[x].to_numpy().astype('int64') if np.issubdtype(df[x].dtype, np.datetime64) else df[x].to_numpy()
+    return df.iloc[lttb_indices(xs, df[y].to_numpy(), n_out)]
+
+
+# --- ÇİZGİ SERİSİNDEN MUM ÜRETME ---
+# interval: pandas frekansı ("1h", "4h", "1D" ...)
+def resample_ohlc(df, interval):
+    if df.empty: return pd.DataFrame(columns=['time', 'open', 'high', 'low', 'close'])
+    ohlc = df.set_index('time')['price'].resample(interval).ohlc().dropna()
+    return ohlc.reset_index()
+
+
+# Pencere uzunluğuna göre ~40-180 mum verecek, depodaki adımdan (5dk / 1s / 1g) kaba aralık
+def auto_interval(days):
+    return {"1": "15min", "7": "4h", "30": "4h"}.get(str(days), "3D")
@@ -0,0 +1,37 @@
+# --- KUR TABLOSU ---
+# Fiyat ve geçmiş tek bir baz para biriminde (USD) çekilip saklanır; TRY/EUR gösterimi
+# okuma anında kur çarpanıyla yapılır. Böylece her cache anahtarı ve ts_store dosyası
+# para birimi başına bir kez değil, tek kez tutulur ve para birimi değişimi ağ beklemez.
+# Kurlar CoinGecko /exchange_rates'ten (BTC bazlı) türetilir.
+
+BASE = "usd"
+
+# Göstergelerden fiyat ölçeğinde olanlar (RSI ölçekten bağımsızdır)
+PRICE_INDICATORS = ("sma20", "macd", "macd_sig", "upper_bb", "lower_bb")
+
+
+# {"rates": {"usd": {"value": 64000}, "try": {...}}} -> {"usd": 1.0, "try": 34.0, ...}
+def parse_rates(payload, base=BASE):
+    rates = payload["rates"]
+    b = rates[base]["value"]
+    return {cur: r["value"] / b for cur, r in rates.items() if r.get("value")}
+
+
+# 24s değişim baz para birimindeki değişimdir (kurun günlük hareketi eklenmez)
+def convert_quote(q, currency, rate, base=BASE):
+    if q is None or rate is None: return None
+    if currency == base: return q
+    return {currency: q[base] * rate,
+            f"{currency}_24h_change": q.get(f"{base}_24h_change", 0),
+            f"{currency}_24h_vol": (q.get(f"{base}_24h_vol") or 0) * rate}
+
+
+# Sütunlar tek seferde çarpılır; kaynak DataFrame (cache'teki nesne) değişmez
+def convert_frame(df, cols, rate):
+    if rate == 1.0 or df.empty: return df
+    return df.assign(**{c: df[c].to_numpy() * rate for c in cols})
+
+
+def convert_indicators(tech, rate):
+    if tech is None or rate == 1.0: return tech
+    return {**tech, **{k: tech[k] * rate for k in PRICE_INDICATORS}}
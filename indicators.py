@@ -0,0 +1,154 @@
+import math
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+
+# --- ARTIMLI (STREAMING) GÖSTERGE MOTORU ---
+# calculate_indicators'daki pandas formüllerinin birebir karşılığı; ama her yeni
+# fiyat noktası O(1) ile işlenir:
+#   RSI(14)   : kazanç/kayıp için 14'lük kayan toplam (rolling mean)
+#   SMA/BB(20): 20'lik kayan ortalama + kayan Welford varyansı (ddof=1)
+#   MACD      : span 12/26/9 EWM (adjust=False) akümülatörleri
+# Durum (coin, para birimi, pencere) başına tutulur; tek süreç birçok coin'e hizmet eder.
+
+RSI_WINDOW, SMA_WINDOW = 14, 20
+FAST, SLOW, SIGNAL = 12, 26, 9
+MIN_POINTS = 26
+RESYNC = 1000  # kayan toplamların kayan nokta sapmasını bu kadar adımda bir sıfırla
+
+
+class IndicatorState:
+    def __init__(self):
+        self.gains = deque(maxlen=RSI_WINDOW)
+        self.losses = deque(maxlen=RSI_WINDOW)
+        self.prices = deque(maxlen=SMA_WINDOW)
+        self.gain_sum = self.loss_sum = 0.0
+        self.mean = self.m2 = 0.0
+        self.ema_fast = self.ema_slow = self.ema_signal = None
+        self.last_price = None
+        self.last_time = None
+        self.count = 0
+        self.prev = None  # son update'ten önceki hâl; son nokta yeniden yazılırsa geri alınır
+
+    def copy(self):
+        c = IndicatorState.__new__(IndicatorState)
+        c.__dict__.update(self.__dict__)
+        c.gains, c.losses, c.prices = deque(self.gains, RSI_WINDOW), deque(self.losses, RSI_WINDOW), deque(self.prices, SMA_WINDOW)
+        c.prev = None
+        return c
+
+    def update(self, t, price):
+        self.prev = self.copy()
+        price = float(price)
+        # pandas: ilk delta NaN -> where(...) ile 0 olur
+        delta = 0.0 if self.last_price is None else price - self.last_price
+        self._push_sum("gains", "gain_sum", delta if delta > 0 else 0.0)
+        self._push_sum("losses", "loss_sum", -delta if delta < 0 else 0.0)
+        self._push_price(price)
+        a_fast, a_slow, a_sig = 2 / (FAST + 1), 2 / (SLOW + 1), 2 / (SIGNAL + 1)
+        self.ema_fast = price if self.ema_fast is None else a_fast * price + (1 - a_fast) * self.ema_fast
+        self.ema_slow = price if self.ema_slow is None else a_slow * price + (1 - a_slow) * self.ema_slow
+        macd = self.ema_fast - self.ema_slow
+        self.ema_signal = macd if self.ema_signal is None else a_sig * macd + (1 - a_sig) * self.ema_signal
+        self.last_price, self.last_time = price, t
+        self.count += 1
+        if self.count % RESYNC == 0: self._resync()
+
+    def _push_sum(self, name, total, value):
+        window = getattr(self, name)
+        old = window[0] if len(window) == window.maxlen else 0.0
+        window.append(value)
+        setattr(self, total, getattr(self, total) + value - old)
+
+    def _push_price(self, x):
+        w = self.prices
+        if len(w) < w.maxlen:
+            w.append(x)
+            d = x - self.mean
+            self.mean += d / len(w)
+            self.m2 += d * (x - self.mean)
+        else:
+            old = w[0]
+            w.append(x)
+            new_mean = self.mean + (x - old) / len(w)
+            self.m2 += (x - old) * (x - new_mean + old - self.mean)
+            self.mean = new_mean
+
+    def _resync(self):
+        self.gain_sum, self.loss_sum = math.fsum(self.gains), math.fsum(self.losses)
+        p = np.fromiter(self.prices, float)
+        self.mean = float(p.mean())
+        self.m2 = float(((p - self.mean) ** 2).sum())
+
+    def snapshot(self):
+        nan = float("nan")
+        if len(self.gains) == RSI_WINDOW:
+            gain, loss = self.gain_sum / RSI_WINDOW, self.loss_sum / RSI_WINDOW
+            if loss > 0: rsi = 100 - 100 / (1 + gain / loss)
+            else: rsi = 100.0 if gain > 0 else nan
+        else: rsi = nan
+        if len(self.prices) == SMA_WINDOW:
+            sma20 = self.mean
+            std = math.sqrt(max(self.m2, 0.0) / (SMA_WINDOW - 1))
+        else: sma20 = std = nan
+        macd, signal = self.ema_fast - self.ema_slow, self.ema_signal
+        price = self.last_price
+
+        trend = "YÜKSELİŞ" if price > sma20 else "DÜŞÜŞ"
+        rsi_msg = "AŞIRI ALIM" if rsi > 70 else "AŞIRI SATIM" if rsi < 30 else "NÖTR"
+        macd_msg = "AL" if macd > signal else "SAT"
+        return {
+            "rsi": rsi, "rsi_msg": rsi_msg,
+            "trend": trend, "sma20": sma20,
+            "macd": macd, "macd_sig": signal, "macd_msg": macd_msg,
+            "upper_bb": sma20 + std * 2, "lower_bb": sma20 - std * 2
+        }
+
+
+# --- ÇOK COIN'Lİ MOTOR ---
+class IndicatorEngine:
+    MAX_STATES = 1024
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._states = OrderedDict()
+
+    # times: artan int64 zaman damgaları, prices: aynı uzunlukta fiyatlar.
+    # Bilinen son noktadan sonrakiler O(1)/nokta ile eklenir; seri tutarsızsa baştan kurulur.
+    def snapshot(self, key, times, prices):
+        with self._lock:
+            state = self._states.get(key)
+            start = None
+            if state is not None:
+                self._states.move_to_end(key)
+                start = _resume_index(state, times, prices)
+                if start is None and state.prev is not None:
+                    # Son nokta yeniden yazılmış (aynı kovada daha yeni fiyat): bir adım geri al
+                    start = _resume_index(state.prev, times, prices)
+                    if start is not None: state = state.prev
+            if start is None:
+                state, start = IndicatorState(), 0
+            for i in range(start, len(times)):
+                state.update(int(times[i]), prices[i])
+            self._states[key] = state
+            while len(self._states) > self.MAX_STATES: self._states.popitem(last=False)
+            return state.snapshot()
+
+
+def _resume_index(state, times, prices):
+    if state.last_time is None: return None
+    i = int(np.searchsorted(times, state.last_time))
+    if i < len(times) and times[i] == state.last_time and prices[i] == state.last_price: return i + 1
+    return None
+
+
+ENGINE = IndicatorEngine()
+
+
+def indicators_from_series(times, prices, key=None):
+    if len(prices) < MIN_POINTS: return None
+    if key is not None: return ENGINE.snapshot(key, times, prices)
+    state = IndicatorState()
+    for t, p in zip(times, prices): state.update(int(t), p)
+    return state.snapshot()
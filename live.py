@@ -0,0 +1,222 @@
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+
+from metrics import METRICS, lazy_import, log
+
+# --- CANLI FİYAT AKIŞI ---
+# Bir akış kaynağından (varsayılan: CoinCap WebSocket, USD) gelen fiyatlar coin başına
+# sabit boyutlu NumPy halka tamponlarına yazılır. Başlık fiyatı ve mini grafiklerin ucu
+# REST beklemeden buradan okunur. Kaynak takılabilir:
+#   NEXUS_LIVE_FEED=wss://ws.coincap.io/prices   (varsayılan, websocket-client gerekir)
+#   NEXUS_LIVE_FEED=replay:bench/fixtures/market_chart   (yerel tekrar, test/bench için)
+#   NEXUS_LIVE_FEED=off
+# LiveFeed.status() akışın gerçek durumunu verir: "live" (son MAX_AGE sn içinde tick geldi),
+# "connected" (bağlı ama tick yok), "offline" (bağlantı yok / yeniden bağlanıyor), "off".
+
+LIVE_FEED = os.environ.get("NEXUS_LIVE_FEED", "wss://ws.coincap.io/prices")
+RING_SIZE = 4096     # coin başına tutulan son tick sayısı
+MAX_COINS = 256
+MAX_AGE = 15         # sn; bundan eski tick "canlı" sayılmaz
+BASE = "usd"         # akışın para birimi
+
+# CoinGecko id -> CoinCap id (farklı olanlar). Eşlenmeyen id'ler aynen kullanılır;
+# NEXUS_LIVE_IDS="gecko-id=cap-id,..." ile eklenebilir/ezilebilir.
+COINCAP_IDS = {
+    "binancecoin": "binance-coin",
+    "ripple": "xrp",
+    "avalanche-2": "avalanche",
+    "matic-network": "polygon",
+    "crypto-com-chain": "crypto-com-coin",
+    "near": "near-protocol",
+    **dict(p.split("=", 1) for p in os.environ.get("NEXUS_LIVE_IDS", "").split(",") if "=" in p),
+}
+
+
+class TickRing:
+    __slots__ = ("times", "prices", "n")
+
+    def __init__(self, size=RING_SIZE):
+        self.times = np.zeros(size, dtype=np.int64)
+        self.prices = np.zeros(size, dtype=np.float64)
+        self.n = 0
+
+    def append(self, t, price):
+        i = self.n % len(self.times)
+        self.times[i] = t
+        self.prices[i] = price
+        self.n += 1
+
+    def last(self):
+        if not self.n: return None
+        i = (self.n - 1) % len(self.times)
+        return int(self.times[i]), float(self.prices[i])
+
+    # Zaman sırasında kopya döner (tampon yazılmaya devam ederken güvenli)
+    def view(self, since_ms=None):
+        size = len(self.times)
+        if self.n <= size: t, p = self.times[:self.n].copy(), self.prices[:self.n].copy()
+        else:
+            i = self.n % size
+            t, p = np.concatenate((self.times[i:], self.times[:i])), np.concatenate((self.prices[i:], self.prices[:i]))
+        if since_ms is not None:
+            k = np.searchsorted(t, since_ms, side="right")
+            t, p = t[k:], p[k:]
+        return t, p
+
+
+class TickStore:
+    WATCH_TTL = 600
+
+    def __init__(self, max_coins=MAX_COINS, ring_size=RING_SIZE):
+        self.max_coins, self.ring_size = max_coins, ring_size
+        self._lock = threading.Lock()
+        self._rings = OrderedDict()
+        self._wanted = {}       # coin -> son izlenme zamanı
+        self.version = 0        # her yeni izleme setinde artar (kaynak yeniden abone olur)
+        self._listeners = []    # her ingest sonrası tick sözlüğüyle çağrılır (ör. alarm motoru)
+        self.last_tick = 0      # ms; herhangi bir coin için son tick zamanı
+
+    def ingest(self, ticks, t=None):
+        t = t or int(time.time() * 1000)
+        with self._lock:
+            for coin, price in ticks.items():
+                ring = self._rings.get(coin)
+                if ring is None:
+                    ring = self._rings[coin] = TickRing(self.ring_size)
+                    while len(self._rings) > self.max_coins: self._rings.popitem(last=False)
+                else: self._rings.move_to_end(coin)
+                ring.append(t, price)
+            if ticks: self.last_tick = t
+        METRICS.inc("nexus_live_ticks_total", len(ticks))
+        for fn in self._listeners:
+            try: fn(ticks)
+            except Exception: log.exception("tick listener failed")
+
+    def subscribe(self, fn):
+        self._listeners.append(fn)
+
+    def latest(self, coin, max_age=MAX_AGE):
+        with self._lock:
+            ring = self._rings.get(coin)
+            last = ring.last() if ring else None
+        if last is None or time.time() * 1000 - last[0] > max_age * 1000: return None
+        return last
+
+    def ticks(self, coin, since_ms=None):
+        with self._lock:
+            ring = self._rings.get(coin)
+            if ring is None: return np.empty(0, dtype=np.int64), np.empty(0)
+            return ring.view(since_ms)
+
+    # Sayfa her render'da izlediği coin'leri bildirir; WATCH_TTL boyunca kimse bakmazsa düşer
+    def watch(self, *coins):
+        now = time.monotonic()
+        with self._lock:
+            new = [c for c in coins if c not in self._wanted]
+            for c in coins: self._wanted[c] = now
+            for c in [c for c, seen in self._wanted.items() if now - seen > self.WATCH_TTL]: del self._wanted[c]
+            if new: self.version += 1
+
+    def wanted(self):
+        with self._lock: return self.version, sorted(self._wanted)
+
+
+# --- KAYNAKLAR ---
+# Her kaynak run(store, stop) ile çalışır ve stop set edilene kadar store.ingest çağırır;
+# bağlantı durumunu connected ile bildirir.
+class WebSocketSource:
+    RECONNECT_MAX = 60
+
+    def __init__(self, url, ids=COINCAP_IDS):
+        self.url = url
+        self.connected = False
+        self.to_feed = dict(ids)
+        self.from_feed = {v: k for k, v in self.to_feed.items()}
+
+    def run(self, store, stop):
+        websocket = lazy_import("websocket")  # websocket-client (isteğe bağlı bağımlılık)
+        fails = 0
+        while not stop.is_set():
+            version, coins = store.wanted()
+            if not coins:
+                stop.wait(1)
+                continue
+            try:
+                assets = ",".join(self.to_feed.get(c, c) for c in coins)
+                ws = websocket.create_connection(f"{self.url}?assets={assets}", timeout=10)
+                ws.settimeout(1)
+                fails, self.connected = 0, True
+                try:
+                    # İzleme seti değişince yeni abonelikle tekrar bağlanılır
+                    while not stop.is_set() and store.wanted()[0] == version:
+                        try: msg = ws.recv()
+                        except websocket.WebSocketTimeoutException: continue
+                        store.ingest({self.from_feed.get(k, k): float(v) for k, v in json.loads(msg).items()})
+                finally:
+                    self.connected = False
+                    ws.close()
+            except Exception:
+                fails += 1
+                METRICS.inc("nexus_live_reconnects_total")
+                log.warning("live feed disconnected: %s", self.url, exc_info=fails == 1)
+                stop.wait(min(self.RECONNECT_MAX, 2 ** fails))
+
+
+# bench/fixtures/market_chart formatındaki ({step_ms, prices}) kayıtları interval aralıklarla
+# tekrar oynatır; seriler bitince başa sarar.
+class ReplaySource:
+    def __init__(self, path, interval=1.0):
+        self.path, self.interval = path, interval
+        self.connected = False
+
+    def run(self, store, stop):
+        series = {}
+        for fn in sorted(os.listdir(self.path)):
+            if fn.endswith(".json"):
+                with open(os.path.join(self.path, fn)) as f: series[fn[:-5]] = json.load(f)["prices"]
+        step, self.connected = 0, True
+        while not stop.wait(self.interval if step else 0):
+            _, coins = store.wanted()
+            ticks = {c: float(series[c][step % len(series[c])]) for c in coins if c in series}
+            if ticks: store.ingest(ticks)
+            step += 1
+
+
+def make_source(spec=LIVE_FEED):
+    if not spec or spec == "off": return None
+    if spec.startswith("replay:"): return ReplaySource(spec[len("replay:"):])
+    return WebSocketSource(spec)
+
+
+class LiveFeed:
+    def __init__(self, store, source):
+        self.store, self.source = store, source
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self.source is not None and self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nexus-live", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self):
+        if self.source is None: return "off"
+        if time.time() * 1000 - self.store.last_tick <= MAX_AGE * 1000: return "live"
+        return "connected" if self.source.connected else "offline"
+
+    def _run(self):
+        try: self.source.run(self.store, self._stop)
+        except Exception: log.exception("live feed stopped")
+        finally: self.source.connected = False
+
+
+TICKS = TickStore()
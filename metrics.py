@@ -0,0 +1,154 @@
+import functools
+import importlib
+import logging
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# --- METRİKLER ---
+# Süreç içi sayaçlar ve süre histogramları. Uygulamadaki debug paneli (?debug=1) ve
+# Prometheus text formatı (isteğe bağlı NEXUS_METRICS_PORT üzerinden /metrics) buradan beslenir.
+#   nexus_stage_seconds{stage=...}          : rerun aşamaları (prefetch, indicators, figure, gemini, render)
+#   nexus_upstream_seconds{endpoint=...}    : CoinGecko istek süreleri
+#   nexus_upstream_requests_total{endpoint, status} : 200 / 429 / timeout / error ...
+#   nexus_cache_requests_total{fn, result}  : hit / stale / miss
+
+log = logging.getLogger("nexus")
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SAMPLES = 512  # panelde p50/p95 için tutulan son ölçümler
+
+
+class _Histogram:
+    __slots__ = ("count", "total", "max", "buckets", "recent")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent = deque(maxlen=SAMPLES)
+
+    def observe(self, v):
+        self.count += 1
+        self.total += v
+        self.max = max(self.max, v)
+        self.recent.append(v)
+        for i, b in enumerate(BUCKETS):
+            if v <= b: self.buckets[i] += 1
+
+
+class Metrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._hists = {}
+
+    def inc(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock: self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            h = self._hists.get(key)
+            if h is None: h = self._hists[key] = _Histogram()
+            h.observe(seconds)
+
+    # Süreç başına bir kez kaydedilir (ör. ilk rerun'daki import süresi)
+    def observe_once(self, name, seconds, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key in self._hists: return
+        self.observe(name, seconds, **labels)
+
+    @contextmanager
+    def span(self, stage):
+        t = time.perf_counter()
+        try: yield
+        finally: self.observe("nexus_stage_seconds", time.perf_counter() - t, stage=stage)
+
+    def timed(self, stage):
+        def deco(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(stage): return fn(*args, **kwargs)
+            return wrapper
+        return deco
+
+    # --- PANEL İÇİN ÖZET ---
+    def counters(self):
+        with self._lock:
+            return [(name, dict(labels), v) for (name, labels), v in sorted(self._counters.items())]
+
+    def histograms(self):
+        rows = []
+        with self._lock:
+            for (name, labels), h in sorted(self._hists.items()):
+                recent = sorted(h.recent)
+                pick = lambda q: recent[min(len(recent) - 1, int(q * len(recent)))] if recent else 0.0
+                rows.append((name, dict(labels), h.count, h.total / max(h.count, 1), pick(0.5), pick(0.95), h.max))
+        return rows
+
+    # --- PROMETHEUS TEXT FORMAT ---
+    def render_prometheus(self):
+        def fmt(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items: return ""
+            return "{" + ",".join(f'{k}="{str(v).replace(chr(34), chr(39))}"' for k, v in items) + "}"
+
+        lines, typed = [], set()
+        with self._lock:
+            for (name, labels), v in sorted(self._counters.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} counter")
+                    typed.add(name)
+                lines.append(f"{name}{fmt(labels)} {v}")
+            for (name, labels), h in sorted(self._hists.items()):
+                if name not in typed:
+                    lines.append(f"# TYPE {name} histogram")
+                    typed.add(name)
+                for b, c in zip(BUCKETS, h.buckets):
+                    lines.append(f"{name}_bucket{fmt(labels, [('le', b)])} {c}")
+                lines.append(f"{name}_bucket{fmt(labels, [('le', '+Inf')])} {h.count}")
+                lines.append(f"{name}_sum{fmt(labels)} {h.total}")
+                lines.append(f"{name}_count{fmt(labels)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = Metrics()
+
+
+# Ağır SDK'lar (Gemini, Plotly) sadece ilgili yol çalıştığında yüklenir; ilk yükleme süresi ölçülür
+def lazy_import(name):
+    mod = sys.modules.get(name)
+    if mod is not None: return mod
+    t = time.perf_counter()
+    mod = importlib.import_module(name)
+    METRICS.observe("nexus_import_seconds", time.perf_counter() - t, module=name)
+    return mod
+
+
+# --- /metrics HTTP UCU ---
+def serve_metrics(port, metrics=METRICS):
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.render_prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    server = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="nexus-metrics", daemon=True).start()
+    return server
@@ -0,0 +1,173 @@
+import datetime
+import email.utils
+import json
+import os
+import re
+import threading
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+
+from data_engine import SESSION
+from metrics import METRICS, log
+
+# --- HABER TOPLAYICI ---
+# Birden fazla RSS/Atom/JSON kaynağı paralel çekilir. Her kaynak için ETag/Last-Modified
+# saklanır; değişmeyen kaynak 304 döner ve eski kayıtları korunur. Neredeyse aynı başlıklar
+# (ör. "$64,000" / "$64K") tek kayda indirilir; kayıtlar kelime ve ticker (BTC, SOL)
+# bazında indekslenir, get_news bu indeksten okur. Yenileme sadece poller'dan yapılır;
+# sayfa render'ı hiçbir zaman ağ beklemez.
+#   NEXUS_NEWS_FEEDS="http://127.0.0.1:8765/news.xml,file:///tmp/feed.xml"
+
+DEFAULT_FEEDS = (
+    "https://www.coindesk.com/arc/outboundfeeds/rss/",
+    "https://cointelegraph.com/rss",
+    "https://decrypt.co/feed",
+)
+FEEDS = tuple(u.strip() for u in os.environ.get("NEXUS_NEWS_FEEDS", "").split(",") if u.strip()) or DEFAULT_FEEDS
+TIMEOUT = 8
+MAX_PER_FEED = 100
+MAX_ITEMS = 300      # tüm kaynaklardan tutulan en yeni kayıt sayısı
+DUP_JACCARD = 0.75   # başlık kelime kümesi benzerliği bu değerin üstündeyse kopya sayılır
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+# --- BAŞLIK NORMALİZASYONU ---
+def _num(m):
+    n = float(m.group(1).replace(",", ""))
+    n *= {"k": 1e3, "m": 1e6, "b": 1e9}.get((m.group(2) or "").lower(), 1)
+    return f"{n:f}".rstrip("0").rstrip(".")
+
+
+def title_tokens(title):
+    t = re.sub(r"(\d[\d,]*(?:\.\d+)?)(?:\s?([kmb])\b)?", _num, title.lower())
+    return frozenset(re.findall(r"[a-z0-9.]+", t)) - {"a", "an", "the", "as", "to", "of", "in", "on", "for", "and", "."}
+
+
+def tickers(title):
+    return {w.lower() for w in re.findall(r"\$?\b([A-Z][A-Z0-9]{1,5})\b", title)}
+
+
+# --- AYRIŞTIRMA ---
+def _when(text):
+    if not text: return None
+    try: return email.utils.parsedate_to_datetime(text).timestamp()
+    except (TypeError, ValueError): pass
+    try: return datetime.datetime.fromisoformat(text.strip().replace("Z", "+00:00")).timestamp()
+    except ValueError: return None
+
+
+def _item(title, link, published, source, fetched):
+    title = " ".join((title or "").split())
+    if not title or not (link or "").startswith(("http://", "https://")): return None
+    return {"title": title, "link": link, "published": published or fetched, "source": source}
+
+
+def parse_feed(body, source, fetched=None):
+    fetched = fetched or time.time()
+    text = body.lstrip()
+    out = []
+    if text[:1] in (b"{", b"["):
+        data = json.loads(body)
+        rows = (data.get("items") or data.get("Data") or []) if isinstance(data, dict) else data
+        for r in rows[:MAX_PER_FEED]:
+            published = _when(r.get("date_published")) or r.get("published_on")
+            out.append(_item(r.get("title"), r.get("url") or r.get("link"), published, source, fetched))
+    else:
+        root = ET.fromstring(body)
+        for el in root.iter("item"):
+            out.append(_item(el.findtext("title"), (el.findtext("link") or "").strip(), _when(el.findtext("pubDate")), source, fetched))
+            if len(out) >= MAX_PER_FEED: break
+        for el in root.iter(ATOM + "entry"):
+            link = next((l.get("href") for l in el.findall(ATOM + "link") if l.get("rel", "alternate") == "alternate"), None)
+            out.append(_item(el.findtext(ATOM + "title"), link, _when(el.findtext(ATOM + "updated") or el.findtext(ATOM + "published")), source, fetched))
+            if len(out) >= MAX_PER_FEED: break
+    return [i for i in out if i]
+
+
+# --- BİRLEŞTİRME + İNDEKS ---
+def dedup(items):
+    kept, seen = [], []
+    for it in sorted(items, key=lambda i: -i["published"]):
+        toks = title_tokens(it["title"])
+        if any(len(toks & s) / max(1, len(toks | s)) >= DUP_JACCARD for s in seen): continue
+        kept.append(it)
+        seen.append(toks)
+        if len(kept) >= MAX_ITEMS: break
+    return kept
+
+
+def build_index(items):
+    words, ticks = {}, {}
+    for n, it in enumerate(items):
+        for w in title_tokens(it["title"]): words.setdefault(w, []).append(n)
+        for t in tickers(it["title"]): ticks.setdefault(t, []).append(n)
+    return words, ticks
+
+
+class NewsHub:
+    def __init__(self, feeds=FEEDS):
+        self.feeds = tuple(feeds)
+        self._lock = threading.Lock()
+        self._validators = {}   # url -> {"ETag": ..., "Last-Modified": ...} ya da dosya mtime
+        self._by_feed = {}      # url -> son başarılı ayrıştırma
+        self._view = ([], {}, {})
+        self._pool = ThreadPoolExecutor(max_workers=min(8, max(1, len(self.feeds))), thread_name_prefix="nexus-news")
+
+    def _fetch(self, url):
+        if url.startswith("file://") or "://" not in url:
+            path = url[len("file://"):] if url.startswith("file://") else url
+            mtime = os.path.getmtime(path)
+            if self._validators.get(url) == mtime: return None
+            with open(path, "rb") as f: body = f.read()
+            self._validators[url] = mtime
+            return parse_feed(body, os.path.basename(path))
+        headers = {"Accept": "application/rss+xml, application/atom+xml, application/json, */*"}
+        v = self._validators.get(url) or {}
+        if "ETag" in v: headers["If-None-Match"] = v["ETag"]
+        if "Last-Modified" in v: headers["If-Modified-Since"] = v["Last-Modified"]
+        r = SESSION.get(url, headers=headers, timeout=TIMEOUT)
+        METRICS.inc("nexus_news_fetch_total", status=str(r.status_code))
+        if r.status_code == 304: return None
+        r.raise_for_status()
+        self._validators[url] = {k: r.headers[k] for k in ("ETag", "Last-Modified") if k in r.headers}
+        return parse_feed(r.content, re.sub(r"^https?://(www\.)?", "", url).split("/")[0])
+
+    # Poller tarafından çağrılır; değişen kaynak yoksa indeks yeniden kurulmaz
+    def refresh_feeds(self):
+        futures = {url: self._pool.submit(self._fetch, url) for url in self.feeds}
+        changed, failed = False, 0
+        for url, fut in futures.items():
+            try: items = fut.result()
+            except Exception:
+                failed += 1
+                METRICS.inc("nexus_news_fetch_total", status="error")
+                log.warning("news feed failed: %s", url, exc_info=True)
+                continue
+            if items is not None:
+                self._by_feed[url] = items
+                changed = True
+        if changed or not self._view[0]:
+            items = dedup([i for feed in self._by_feed.values() for i in feed])
+            with self._lock: self._view = (items, *build_index(items))
+        if failed == len(self.feeds): raise RuntimeError("all news feeds failed")
+        return len(self._view[0])
+
+    def latest(self, limit=10):
+        with self._lock: return self._view[0][:limit]
+
+    # coin id / isim kelimelerinin hepsi ya da ticker başlıkta geçiyorsa eşleşir
+    def lookup(self, coin_id, symbol=None, name=None, limit=10):
+        with self._lock: items, words, ticks = self._view
+        hits = set()
+        for phrase in {coin_id, name}:
+            toks = [t for t in re.split(r"[\s\-]+", (phrase or "").lower()) if t]
+            if not toks: continue
+            sets = [set(words.get(t, ())) for t in toks]
+            hits |= set.intersection(*sets)
+        if symbol: hits |= set(ticks.get(symbol.lower(), ()))
+        return [items[n] for n in sorted(hits)[:limit]]
+
+
+NEWS = NewsHub()
@@ -0,0 +1,89 @@
+import threading
+import time
+
+from data_engine import fan_out
+from metrics import METRICS
+
+# --- ARKA PLAN PİYASA POLLER'I ---
+# Süreç başına tek bir iş parçacığı; top-N piyasa, bitcoin, global veri ve
+# kullanıcıların izlediği coin'leri zamanlanmış aralıklarla yeniler ve sonucu
+# paylaşılan SWR cache'ine yazar. get_* fonksiyonları bu cache'i okur; sayfa
+# render'ı ağ beklemez, upstream yükü kullanıcı sayısından bağımsız kalır.
+# Aynı anda vadesi gelen işler paralel çalışır (fiyatlar batcher'da tek çağrıya birleşir).
+
+
+class _Job:
+    __slots__ = ("fn", "args", "interval", "next_run", "expires", "fails")
+
+    def __init__(self, fn, args, interval, expires):
+        self.fn, self.args, self.interval = fn, args, interval
+        self.next_run = 0.0
+        self.expires = expires
+        self.fails = 0
+
+
+class MarketPoller:
+    WATCH_TTL = 600      # bu süre boyunca kimse izlemezse iş düşer
+    MAX_BACKOFF = 600
+    TICK = 1.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jobs = {}
+        self._stop = threading.Event()
+        self._thread = None
+
+    # fn: swr_cached ile sarılmış bir get_* fonksiyonu (refresh() metodu) ya da düz bir çağrılabilir
+    def add(self, fn, args, interval):
+        with self._lock:
+            self._jobs[(fn.__name__,) + tuple(args)] = _Job(fn, tuple(args), interval, None)
+
+    def watch(self, fn, args, interval):
+        key = (fn.__name__,) + tuple(args)
+        expires = time.monotonic() + self.WATCH_TTL
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                job = self._jobs[key] = _Job(fn, tuple(args), interval, expires)
+                # Sayfa zaten bu veriyi yeni okudu; ilk yenileme bir aralık sonra
+                job.next_run = time.monotonic() + interval
+            elif job.expires is not None:
+                job.expires = expires
+
+    def watched(self):
+        with self._lock: return list(self._jobs)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="nexus-poller", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            now = time.monotonic()
+            with self._lock:
+                for key in [k for k, j in self._jobs.items() if j.expires is not None and j.expires < now]:
+                    del self._jobs[key]
+                due = [j for j in self._jobs.values() if j.next_run <= now]
+                for j in due: j.next_run = now + j.interval
+            if due:
+                results = fan_out([(self._refresh, (j,)) for j in due])
+                with self._lock:
+                    for j, ok in zip(due, results):
+                        if ok: j.fails = 0
+                        else:
+                            j.fails += 1
+                            j.next_run = time.monotonic() + min(self.MAX_BACKOFF, 15 * 2 ** (j.fails - 1))
+            self._stop.wait(self.TICK)
+
+    def _refresh(self, job):
+        try:
+            getattr(job.fn, "refresh", job.fn)(*job.args)
+            return True
+        except Exception:
+            METRICS.inc("nexus_poller_failures_total", fn=job.fn.__name__)
+            return False
@@ -0,0 +1,85 @@
+import numpy as np
+
+from indicators import FAST, RSI_WINDOW, SIGNAL, SLOW, SMA_WINDOW
+
+# --- ÇOKLU COIN TEKNİK TARAYICI ---
+# calculate_indicators'daki RSI/SMA20/Bollinger/MACD kuralları, coin başına pandas
+# döngüsü yerine (coin x zaman) 2-B NumPy dizileri üzerinde tek seferde hesaplanır.
+# Satırlar sağa hizalıdır: son kolon her coin'in son fiyatıdır, kısa seriler solda NaN ile dolar.
+
+
+def to_matrix(series_list):
+    width = max((len(s) for s in series_list), default=0)
+    out = np.full((len(series_list), width), np.nan)
+    for i, s in enumerate(series_list):
+        if len(s): out[i, width - len(s):] = s
+    return out
+
+
+# Pencerede tek bir NaN varsa sonuç NaN (pandas rolling ile aynı)
+def rolling_sum(x, w):
+    filled = np.nan_to_num(x)
+    csum = np.cumsum(filled, axis=1)
+    nans = np.cumsum(np.isnan(x), axis=1)
+    out = csum.copy()
+    out[:, w:] -= csum[:, :-w]
+    bad = nans.copy()
+    bad[:, w:] -= nans[:, :-w]
+    out[bad > 0] = np.nan
+    out[:, :w - 1] = np.nan
+    return out
+
+
+def rolling_mean(x, w):
+    return rolling_sum(x, w) / w
+
+
+def rolling_std(x, w):
+    # Büyük fiyatlarda sayısal iptali önlemek için satır ortalaması çıkarılır (varyans değişmez)
+    valid = ~np.isnan(x)
+    c = x - (np.nansum(x, axis=1) / np.maximum(valid.sum(axis=1), 1))[:, None]
+    s1, s2 = rolling_sum(c, w), rolling_sum(c * c, w)
+    return np.sqrt(np.maximum((s2 - s1 * s1 / w) / (w - 1), 0.0))
+
+
+# adjust=False EWM; zaman ekseninde döngü, coin ekseninde vektörel
+def ewm(x, span):
+    alpha = 2 / (span + 1)
+    out = np.empty_like(x)
+    acc = np.full(x.shape[0], np.nan)
+    for t in range(x.shape[1]):
+        col = x[:, t]
+        acc = np.where(np.isnan(acc), col, np.where(np.isnan(col), acc, alpha * col + (1 - alpha) * acc))
+        out[:, t] = acc
+    return out
+
+
+def compute(prices):
+    n = prices.shape[1]
+    if n < SLOW: return None
+    delta = np.diff(prices, axis=1, prepend=np.nan)
+    missing = np.isnan(prices)
+    gain = np.where(delta > 0, delta, 0.0)
+    loss = np.where(delta < 0, -delta, 0.0)
+    gain[missing] = loss[missing] = np.nan
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rs = rolling_mean(gain, RSI_WINDOW) / rolling_mean(loss, RSI_WINDOW)
+        rsi = 100 - 100 / (1 + rs)
+    sma20 = rolling_mean(prices, SMA_WINDOW)
+    std = rolling_std(prices, SMA_WINDOW)
+    macd = ewm(prices, FAST) - ewm(prices, SLOW)
+    signal = ewm(macd, SIGNAL)
+    return {
+        "price": prices[:, -1], "rsi": rsi[:, -1], "sma20": sma20[:, -1],
+        "macd": macd[:, -1], "macd_sig": signal[:, -1],
+        "upper_bb": sma20[:, -1] + 2 * std[:, -1], "lower_bb": sma20[:, -1] - 2 * std[:, -1],
+    }
+
+
+def signals(res):
+    # NaN karşılaştırmaları False döner; tekil hesaplamadaki if/else ile aynı sonuç
+    return {
+        "trend": np.where(res["price"] > res["sma20"], "YÜKSELİŞ", "DÜŞÜŞ"),
+        "rsi_msg": np.where(res["rsi"] > 70, "AŞIRI ALIM", np.where(res["rsi"] < 30, "AŞIRI SATIM", "NÖTR")),
+        "macd_msg": np.where(res["macd"] > res["macd_sig"], "AL", "SAT"),
+    }
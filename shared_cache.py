@@ -0,0 +1,203 @@
+import os
+import pickle
+import time
+import uuid
+import zlib
+
+import numpy as np
+
+from metrics import METRICS, lazy_import, log
+from ts_store import LocalDB
+
+# --- REPLİKALAR ARASI ORTAK CACHE ---
+# swr_cached fetcher'ları ve Gemini cevapları süreç içi cache'in arkasında isteğe bağlı
+# ortak bir katmana yazılır. Birden fazla replika aynı depoyu gösterirse bir anahtar tüm
+# filoda bir kez çekilir: yükleyen replika anahtarın kilidini alır, diğerleri ellerinde eski
+# (süresi geçmiş) bir kayıt varsa onu hemen kullanır, yoksa kilit sahibinin yazdığı değeri kısa
+# süre bekler. Kilit süreli olduğundan çöken replika anahtarı kilitli bırakmaz.
+#   NEXUS_SHARED_CACHE=sqlite:///srv/nexus/shared.db   (aynı makine / ortak disk)
+#   NEXUS_SHARED_CACHE=redis://cache:6379/0            (redis paketi gerekir)
+#   boş / off                                          (sadece süreç içi cache)
+# Değerler pickle (protocol 5) ile yazılır, büyükleri zlib ile sıkıştırılır.
+
+SHARED_CACHE = os.environ.get("NEXUS_SHARED_CACHE", "")
+PREFIX = "nexus:v1:"   # serileştirme biçimi değişirse artırılır; eski kayıtlar okunmaz
+COMPRESS_MIN = 1024    # bayt; bundan küçük değerler sıkıştırılmaz
+KEEP_STALE = 6 * 3600  # sn; TTL'i geçen değer bu kadar daha tutulur (yeni replika boş başlamaz)
+LOCK_TTL = 30          # sn; kilit sahibi bu sürede yazmazsa kilit düşer
+LOCK_WAIT = 10         # sn; kilit bekleyen replika bundan sonra kendisi yükler (arka plan yenilemesi)
+FIRST_WAIT = 1.5       # sn; elinde hiç değer olmayan (ilk render) çağıran için bekleme sınırı
+POLL = 0.05
+
+_DOWN = object()
+
+
+# value: (stamp, değer); ts_store pencereleri np.memmap alt sınıfıdır, düz diziye çevrilip yazılır
+def dumps(value):
+    stamp, v = value
+    if isinstance(v, np.ndarray): value = (stamp, np.asarray(v))
+    raw = pickle.dumps(value, protocol=5)
+    return b"z" + zlib.compress(raw, 1) if len(raw) >= COMPRESS_MIN else b"p" + raw
+
+
+def loads(blob):
+    raw = zlib.decompress(blob[1:]) if blob[:1] == b"z" else blob[1:]
+    value = pickle.loads(raw)
+    # ts_store'dan gelen diziler gibi ortak değerler de salt okunur döner
+    if isinstance(value, tuple) and len(value) == 2 and isinstance(value[1], np.ndarray): value[1].setflags(write=False)
+    return value
+
+
+# --- BACKEND'LER ---
+# Her backend bayt seviyesinde çalışır: get / set(ttl) / acquire(ttl) -> token / release(token)
+class SQLiteBackend:
+    PURGE_EVERY = 256
+
+    def __init__(self, path):
+        self.path = path
+        # İşlemler açık BEGIN IMMEDIATE ile yazılır (otomatik işlem kapalı)
+        self._conn = LocalDB(path, isolation_level=None)
+        self._writes = 0
+        db = self._conn()
+        db.execute("CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires REAL NOT NULL)")
+
+    def get(self, key):
+        row = self._conn().execute("SELECT value FROM kv WHERE key = ? AND expires > ?", (key, time.time())).fetchone()
+        return row[0] if row else None
+
+    def set(self, key, blob, ttl):
+        db = self._conn()
+        db.execute("INSERT OR REPLACE INTO kv (key, value, expires) VALUES (?, ?, ?)", (key, blob, time.time() + ttl))
+        self._writes += 1
+        if self._writes % self.PURGE_EVERY == 0: db.execute("DELETE FROM kv WHERE expires <= ?", (time.time(),))
+
+    def acquire(self, key, ttl):
+        token, now = uuid.uuid4().hex, time.time()
+        db = self._conn()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute("DELETE FROM locks WHERE key = ? AND expires <= ?", (key, now))
+            got = db.execute("INSERT OR IGNORE INTO locks (key, token, expires) VALUES (?, ?, ?)", (key, token, now + ttl)).rowcount
+            db.execute("COMMIT")
+        except Exception:
+            db.execute("ROLLBACK")
+            raise
+        return token if got == 1 else None
+
+    def release(self, key, token):
+        self._conn().execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+
+
+class RedisBackend:
+    # Kilidi sadece sahibi silebilir (süresi dolup başkasına geçmiş kilit silinmez)
+    RELEASE = "if redis.call('get', KEYS[1]) == ARGV[1] then return redis.call('del', KEYS[1]) end return 0"
+
+    def __init__(self, url):
+        redis = lazy_import("redis")  # redis-py (isteğe bağlı bağımlılık)
+        self.r = redis.Redis.from_url(url, socket_timeout=2, socket_connect_timeout=2)
+
+    def get(self, key):
+        return self.r.get(key)
+
+    def set(self, key, blob, ttl):
+        self.r.set(key, blob, px=int(ttl * 1000))
+
+    def acquire(self, key, ttl):
+        token = uuid.uuid4().hex
+        return token if self.r.set("lock:" + key, token, nx=True, px=int(ttl * 1000)) else None
+
+    def release(self, key, token):
+        self.r.eval(self.RELEASE, 1, "lock:" + key, token)
+
+
+def make_backend(spec=SHARED_CACHE):
+    if not spec or spec in ("off", "local"): return None
+    if spec.startswith("sqlite:"): return SQLiteBackend(spec[len("sqlite:"):].removeprefix("//"))
+    if spec.startswith(("redis://", "rediss://", "unix://")): return RedisBackend(spec)
+    raise ValueError(f"NEXUS_SHARED_CACHE anlaşılamadı: {spec}")
+
+
+# --- ORTAK KATMAN ---
+# Kayıt = (stamp, value); stamp değerin upstream'den çekildiği duvar saati zamanıdır.
+# Backend'e ulaşılamazsa katman yok sayılır: cache hatası sayfayı bozmaz, sadece upstream'e gidilir.
+class SharedCache:
+    def __init__(self, backend=None):
+        self.backend = backend
+
+    @property
+    def enabled(self):
+        return self.backend is not None
+
+    def _call(self, op, *args, default=None):
+        try: return getattr(self.backend, op)(*args)
+        except Exception:
+            METRICS.inc("nexus_shared_cache_total", op=op, result="error")
+            log.warning("shared cache %s failed", op, exc_info=True)
+            return default
+
+    def get(self, key):
+        if self.backend is None: return None
+        blob = self._call("get", PREFIX + repr(key))
+        if blob is None: return None
+        try: return loads(blob)
+        except Exception:
+            log.warning("shared cache entry unreadable: %s", key, exc_info=True)
+            return None
+
+    def put(self, key, value, ttl, stamp=None):
+        if self.backend is None: return
+        self._call("set", PREFIX + repr(key), dumps((stamp or time.time(), value)), ttl)
+
+    # ttl içinde ve elimizdekinden (newer_than) yeni bir kayıt varsa onu döndürür
+    def _fresh(self, key, ttl, newer_than):
+        hit = self.get(key)
+        if hit is not None and hit[0] > newer_than and time.time() - hit[0] < ttl: return hit
+        return None
+
+    # Filoda anahtar başına tek yükleme: (stamp, value) döner. Taze kayıt yoksa ama
+    # elimizdekinden yeni, süresi geçmiş (KEEP_STALE) bir kayıt varsa: kilit başkasındaysa
+    # beklemeden o döner; çağıranın hiç değeri yokken yükleme hata verirse de o döner.
+    def load(self, key, loader, ttl, newer_than=0.0):
+        if self.backend is None: return time.time(), loader()
+        hit = self.get(key)
+        stale = hit if hit is not None and hit[0] > newer_than else None
+        if stale is not None and time.time() - stale[0] < ttl:
+            METRICS.inc("nexus_shared_cache_total", op="load", result="hit")
+            return stale
+        lock_key = PREFIX + repr(key)
+        token = self._call("acquire", lock_key, LOCK_TTL, default=_DOWN)
+        if token is None and stale is not None:
+            METRICS.inc("nexus_shared_cache_total", op="load", result="stale")
+            return stale
+        if token is None:
+            deadline = time.monotonic() + (LOCK_WAIT if newer_than else FIRST_WAIT)
+            while time.monotonic() < deadline:
+                time.sleep(POLL)
+                hit = self._fresh(key, ttl, newer_than)
+                if hit is not None:
+                    METRICS.inc("nexus_shared_cache_total", op="load", result="waited")
+                    return hit
+                # Sahibi değer yazmadan bıraktıysa (hata) kilit bu replikaya geçer
+                token = self._call("acquire", lock_key, LOCK_TTL, default=_DOWN)
+                if token is not None: break
+        # Backend'e ulaşılamıyorsa kilitsiz, yerel yükleme
+        if token is _DOWN: token = None
+        try:
+            if token is not None:
+                hit = self._fresh(key, ttl, newer_than)
+                if hit is not None: return hit
+            METRICS.inc("nexus_shared_cache_total", op="load", result="miss" if token else "timeout")
+            try: stamp, value = time.time(), loader()
+            except Exception:
+                # Elinde değer olan çağıran (swr) kendi değerini korur ve geri çekilir
+                if stale is None or newer_than: raise
+                METRICS.inc("nexus_shared_cache_total", op="load", result="stale")
+                return stale
+            self.put(key, value, ttl + KEEP_STALE, stamp)
+            return stamp, value
+        finally:
+            if token is not None: self._call("release", lock_key, token)
+
+
+SHARED = SharedCache(make_backend())
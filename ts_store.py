@@ -0,0 +1,145 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+
+# --- KALICI ZAMAN SERİSİ DEPOSU ---
+# market_chart ve OHLC geçmişi coin/para birimi/çözünürlük başına tek bir .npy
+# dosyasında (kayıt dtype'ı: int64 zaman + float64 kolonlar) tutulur ve mmap ile
+# okunur. Her güncellemede sadece son kayıttan sonraki kuyruk çekilir; 24s/7g/1a/6a
+# pencereleri bu deponun dilimleridir. Yeniden başlatmada geçmiş diskte hazır bekler.
+# Dönen diziler salt okunurdur (mmap, writeable=False): cache'teki tek nesneyi tüm
+# oturumlar kopyalamadan paylaşır; sayfa önbelleği sayesinde süreçler arası da paylaşılır.
+# mmap sadece POSIX'te: Windows'ta eşlenmiş dosyanın üzerine os.replace yapılamaz (cache'te
+# eski pencere dururken her kuyruk birleştirme hata verirdi). Orada dosya belleğe okunur,
+# dizi yine salt okunur işaretlenir.
+
+DATA_DIR = os.environ.get("NEXUS_DATA_DIR", ".nexus_data")
+MMAP = os.name != "nt"
+
+MINUTE = 60_000
+HOUR = 60 * MINUTE
+DAY = 24 * HOUR
+
+# name: dosya adı, step: çözünürlük (ms), keep: saklama süresi (ms)
+# full_days: sıfırdan doldururken istenecek gün, full_after: bu boşluktan büyükse sıfırdan doldur
+Spec = namedtuple("Spec", "name step keep full_days full_after")
+
+LINE_SPECS = {
+    "1": Spec("5m", 5 * MINUTE, 2 * DAY, 1, DAY),
+    "7": Spec("1h", HOUR, 90 * DAY, 90, 90 * DAY),
+    "30": Spec("1h", HOUR, 90 * DAY, 90, 90 * DAY),
+    "180": Spec("1d", DAY, 365 * DAY, 365, 365 * DAY),
+}
+OHLC_SPECS = {
+    "1": Spec("30m", 30 * MINUTE, 2 * DAY, 1, DAY),
+    "7": Spec("4h", 4 * HOUR, 60 * DAY, 30, 30 * DAY),
+    "30": Spec("4h", 4 * HOUR, 60 * DAY, 30, 30 * DAY),
+    "180": Spec("4d", 4 * DAY, 365 * DAY, 180, 180 * DAY),
+}
+# /ohlc sadece sabit `days` değerlerini kabul eder; kuyruğu örten en küçük değer seçilir
+OHLC_DAYS = {"30m": (1,), "4h": (7, 14, 30), "4d": (90, 180)}
+
+FRESH = 30 * MINUTE  # son kayıt bundan yeniyse ağa hiç gidilmez
+
+LINE_COLS = ("price",)
+OHLC_COLS = ("open", "high", "low", "close")
+
+
+# --- YEREL SQLITE BAĞLANTILARI ---
+# Topluluk, alarm ve ortak cache depoları aynı ayarla açılır (WAL, synchronous=NORMAL).
+# sqlite3 bağlantıları thread'ler arasında paylaşılmaz; db() her thread'e kendi bağlantısını verir.
+class LocalDB:
+    def __init__(self, path, **connect):
+        self.path, self.connect = path, connect
+        self._local = threading.local()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+    def __call__(self):
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=5, **self.connect)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def _dtype(cols):
+    return np.dtype([("time", "<i8")] + [(c, "<f8") for c in cols])
+
+
+def empty(cols):
+    arr = np.empty(0, dtype=_dtype(cols))
+    arr.flags.writeable = False
+    return arr
+
+
+class SeriesStore:
+    def __init__(self, root=DATA_DIR):
+        self.root = root
+        self._locks = {}
+        self._guard = threading.Lock()
+
+    def _path(self, kind, coin_id, currency, gran):
+        safe = "".join(ch for ch in coin_id if ch.isalnum() or ch in "-_.")
+        return os.path.join(self.root, kind, currency, safe, f"{gran}.npy")
+
+    def lock(self, kind, coin_id, currency, gran):
+        with self._guard:
+            return self._locks.setdefault((kind, coin_id, currency, gran), threading.Lock())
+
+    def load(self, kind, coin_id, currency, gran, cols):
+        path = self._path(kind, coin_id, currency, gran)
+        try:
+            arr = np.load(path, mmap_mode="r" if MMAP else None)
+            if arr.dtype == _dtype(cols):
+                arr.flags.writeable = False
+                return arr
+        except (OSError, ValueError):
+            pass
+        return empty(cols)
+
+    def merge(self, kind, coin_id, currency, spec, cols, rows, thin=False):
+        old = self.load(kind, coin_id, currency, spec.name, cols)
+        new = np.empty(len(rows), dtype=_dtype(cols))
+        if len(rows):
+            raw = np.asarray(rows, dtype="f8")
+            new["time"] = raw[:, 0].astype("i8")
+            for i, c in enumerate(cols): new[c] = raw[:, i + 1]
+        arr = np.concatenate([np.asarray(old), new])
+        arr = arr[np.argsort(arr["time"], kind="stable")]
+        # Aynı zaman damgasında (veya thin ise aynı kovada) en yeni kayıt kalır
+        bucket = arr["time"] // spec.step if thin else arr["time"]
+        last = np.r_[bucket[1:] != bucket[:-1], True] if len(arr) else np.empty(0, bool)
+        arr = arr[last]
+        if len(arr): arr = arr[arr["time"] >= arr["time"][-1] - spec.keep]
+        self._write(self._path(kind, coin_id, currency, spec.name), arr)
+        # Bellekteki kopya yerine yeni dosyanın salt okunur mmap'i döner
+        return self.load(kind, coin_id, currency, spec.name, cols)
+
+    def _write(self, path, arr):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f: np.save(f, arr)
+        os.replace(tmp, path)
+
+
+# Pencere son kayda göre kesilir; depo bir süre güncellenemese de grafik boşalmaz
+def window(arr, days):
+    if not len(arr): return arr
+    return arr[np.searchsorted(arr["time"], arr["time"][-1] - int(float(days) * DAY)):]
+
+
+def tail_gap(arr):
+    return now_ms() - int(arr["time"][-1]) if len(arr) else None
+
+
+STORE = SeriesStore()